@@ -0,0 +1,52 @@
+"""游戏背景绘制基准测试: 每帧重画网格 vs 预先绘制的背景层
+
+在 AIM_lab 目录下运行:
+    python -m benchmarks.bench_background [帧数]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from src.ui.background import Background
+
+RESOLUTIONS = [(1200, 800), (2560, 1440)]
+GRID_SIZE = 50
+GRID_COLOR = (40, 40, 40)
+BG_COLOR = (70, 70, 70)
+
+def draw_grid(screen, width, height):
+    """旧的绘制方式: 每帧填充底色并逐条画网格线"""
+    screen.fill(BG_COLOR)
+    for x in range(0, width, GRID_SIZE):
+        pygame.draw.line(screen, GRID_COLOR, (x, 0), (x, height))
+    for y in range(0, height, GRID_SIZE):
+        pygame.draw.line(screen, GRID_COLOR, (0, y), (width, y))
+
+def time_frames(draw, frames):
+    """返回每帧平均耗时(毫秒)"""
+    start = time.perf_counter_ns()
+    for _ in range(frames):
+        draw()
+    return (time.perf_counter_ns() - start) / frames / 1e6
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    pygame.init()
+    
+    for width, height in RESOLUTIONS:
+        screen = pygame.display.set_mode((width, height))
+        background = Background(BG_COLOR, GRID_SIZE, GRID_COLOR)
+        background.draw(screen)  # 预先绘制，不计入耗时
+        
+        before = time_frames(lambda: draw_grid(screen, width, height), frames)
+        after = time_frames(lambda: background.draw(screen), frames)
+        print(f"{width}x{height}: grid {before:.3f} ms/frame -> "
+              f"cached {after:.3f} ms/frame ({before / after:.1f}x)")
+    
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
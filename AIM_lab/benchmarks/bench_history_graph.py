@@ -0,0 +1,63 @@
+"""历史图表渲染基准测试
+
+在 AIM_lab 目录下运行:
+    python -m benchmarks.bench_history_graph [记录数] [重复次数]
+"""
+import os
+import sys
+import time
+import random
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from src.utils.score_manager import ScoreManager
+
+def make_records(count):
+    """生成模拟的历史记录"""
+    return [
+        {
+            "timestamp": f"2024-12-24 09:{i // 60 % 60:02d}:{i % 60:02d}",
+            "score": random.randint(0, 60000),
+            "accuracy": random.uniform(50, 100),
+        }
+        for i in range(count)
+    ]
+
+def bench(manager, records, backend, repeat):
+    """返回每张图表的平均渲染时间(微秒)"""
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        manager._render_history_graph(records, 400, 200, backend)
+    elapsed = time.perf_counter_ns() - start
+    # 每次渲染包含分数和准确率两张图
+    return elapsed / repeat / 2 / 1000
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    manager = ScoreManager(graph_cache_dir=None)
+    records = make_records(count)
+
+    print(f"records={count} repeat={repeat}")
+    for backend in ("pygame", "matplotlib"):
+        try:
+            per_graph = bench(manager, records, backend, repeat)
+        except ImportError as e:
+            print(f"{backend:>10}: 跳过 ({e})")
+            continue
+        print(f"{backend:>10}: {per_graph:10.1f} us/graph")
+
+    # 缓存命中时的开销
+    manager.scores = {"Bench": records}
+    manager.create_history_graph("Bench")
+    start = time.perf_counter_ns()
+    for _ in range(repeat):
+        manager.create_history_graph("Bench")
+    print(f"{'cached':>10}: {(time.perf_counter_ns() - start) / repeat / 1000:10.1f} us/call")
+
+if __name__ == "__main__":
+    main()
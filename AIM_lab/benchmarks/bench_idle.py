@@ -0,0 +1,54 @@
+"""菜单空闲时的CPU占用
+
+让主菜单在没有输入的情况下运行一段时间，统计进程CPU时间占墙钟时间的比例，
+超过目标值时以非零状态退出。
+
+在 AIM_lab 目录下运行:
+    python -m benchmarks.bench_idle [秒数]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from src.main_menu import MainMenu
+
+# 空闲时CPU占用的目标上限(占一个核心的百分比)
+IDLE_CPU_TARGET = 5.0
+
+def measure(menu, seconds):
+    """运行菜单直到定时发出的QUIT事件，返回CPU占用百分比"""
+    pygame.time.set_timer(pygame.QUIT, int(seconds * 1000), 1)
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        menu.run()
+    except SystemExit:
+        pass
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    return cpu / wall * 100
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 5.0
+    menu = MainMenu()
+    
+    results = {"menu": measure(menu, seconds)}
+    # 选中一个模式，菜单上会显示历史图表
+    menu.selected_mode = menu.game_modes[0]
+    menu.needs_redraw = True
+    results["menu + graph"] = measure(menu, seconds)
+    
+    failed = False
+    for name, cpu in results.items():
+        ok = cpu <= IDLE_CPU_TARGET
+        failed = failed or not ok
+        print(f"{name:>14}: {cpu:5.1f}% CPU (目标 <= {IDLE_CPU_TARGET}%) {'OK' if ok else 'FAIL'}")
+    
+    pygame.quit()
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
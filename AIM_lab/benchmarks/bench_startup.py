@@ -0,0 +1,53 @@
+"""启动时间: 从 main.py 开始执行到主菜单画出第一帧
+
+多次启动取中位数，超过预算时以非零状态退出；同时检查启动时没有导入
+只在部分功能中用到的重量级模块。
+
+在 AIM_lab 目录下运行:
+    python -m benchmarks.bench_startup [次数]
+"""
+import os
+import statistics
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from src.utils.startup import run_first_frame, parse_importtime
+
+# 首帧时间的预算(毫秒)，其中大部分是 import pygame 本身
+FIRST_FRAME_BUDGET_MS = 500
+
+# 启动时不应该导入的模块，只有用到对应功能时才导入
+DEFERRED_MODULES = (
+    "matplotlib",           # matplotlib 图表后端
+    "sqlite3",              # SQLite 分数存储
+    "src.utils.aim_analytics",
+    "src.modes.six_shot",   # 游戏模式在开始游戏时才导入
+    "src.modes.quick_shot",
+    "src.modes.head_shot",
+)
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    script = os.path.join(ROOT, "main.py")
+    
+    times = [run_first_frame(script)[0] for _ in range(runs)]
+    median = statistics.median(times)
+    
+    _, stderr = run_first_frame(script, importtime=True)
+    imported = {name for _, _, name in parse_importtime(stderr)}
+    eager = [name for name in DEFERRED_MODULES if name in imported]
+    
+    ok = median <= FIRST_FRAME_BUDGET_MS and not eager
+    print(f"首帧时间: 中位数 {median:.1f} ms，最快 {min(times):.1f} ms "
+          f"(预算 <= {FIRST_FRAME_BUDGET_MS} ms)")
+    if eager:
+        print(f"启动时导入了应当延迟导入的模块: {', '.join(eager)}")
+    print("OK" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
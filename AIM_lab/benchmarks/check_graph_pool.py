@@ -0,0 +1,52 @@
+"""检查matplotlib图表能在进程池中真正画出来
+
+分别走同步路径和进程池路径各画一张历史图表，检查返回的是大小正确的Surface
+而不是占位图或 (None, None)。失败时以非零状态退出。需要安装matplotlib。
+
+在 AIM_lab 目录下运行:
+    python -m benchmarks.check_graph_pool [记录数]
+"""
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+from benchmarks.bench_history_graph import make_records
+from src.utils.score_manager import ScoreManager
+
+WIDTH, HEIGHT = 400, 200
+TIMEOUT = 60
+
+def check(name, graphs):
+    ok = all(graph is not None and graph.get_size() == (WIDTH, HEIGHT) for graph in graphs)
+    print(f"{name:>6}: {'OK' if ok else 'FAIL'} {graphs}")
+    return ok
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+
+    pygame.init()
+    pygame.display.set_mode((1, 1))
+    manager = ScoreManager(graph_backend="matplotlib", graph_workers=1)
+    manager.scores = {"Check": make_records(count)}
+
+    ok = check("sync", manager._render_history_graph(manager.scores["Check"], WIDTH, HEIGHT, "matplotlib"))
+
+    start = time.perf_counter()
+    placeholders = manager.create_history_graph("Check", WIDTH, HEIGHT)
+    while manager.graphs_pending():
+        if time.perf_counter() - start > TIMEOUT:
+            print(f"  pool: FAIL 超过 {TIMEOUT} s 没有画完")
+            sys.exit(1)
+        manager.poll_graphs()
+        time.sleep(0.01)
+    graphs = manager.create_history_graph("Check", WIDTH, HEIGHT)
+    ok = check("pool", graphs) and graphs is not placeholders and ok
+    print(f"进程池绘制耗时 {time.perf_counter() - start:.2f} s(包含启动子进程)")
+    print("OK" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
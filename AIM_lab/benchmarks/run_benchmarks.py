@@ -0,0 +1,293 @@
+"""无界面基准测试: 用脚本化的鼠标输入驱动所有游戏模式和主菜单
+
+在 AIM_lab 目录下运行:
+    python -m benchmarks.run_benchmarks [--frames N] [--out 结果.json] [--compare 旧结果.json]
+
+结果保存为JSON(默认 benchmarks/results/<commit>.json)，不同提交的结果可以直接比较。
+"""
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pygame
+from src.settings import Settings
+from src.modes import create_mode
+
+MODES = ("QuickShot", "SixShot", "HeadShot")
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+def summarize(frame_ns):
+    """帧时间统计(毫秒)"""
+    times = sorted(t / 1e6 for t in frame_ns)
+    total = sum(frame_ns) / 1e9
+    return {
+        "frames": len(times),
+        "fps": len(times) / total if total else 0.0,
+        "p50_ms": percentile(times, 50),
+        "p90_ms": percentile(times, 90),
+        "p99_ms": percentile(times, 99),
+        "max_ms": times[-1] if times else 0.0,
+    }
+
+def bench_settings():
+    """基准测试用的设置: 不限帧率，不读取真实鼠标，固定目标生成序列"""
+    settings = Settings()
+    settings.max_fps = 0
+    settings.spawn_seed = 0
+    settings.input_backend = None
+    settings.graph_cache_dir = None
+    return settings
+
+def target_positions(mode):
+    if hasattr(mode, "targets"):
+        return [tuple(t) for t in mode.targets]
+    return [(mode.target_x, mode.target_y)]
+
+class ScriptedMouse:
+    """模拟玩家: 每帧朝最近的目标甩动一段距离，接近后点击，偶尔故意打空"""
+    def __init__(self, mode, seed=0, speed=40):
+        self.mode = mode
+        self.random = random.Random(seed)
+        self.speed = speed
+    
+    def post_events(self):
+        sens = self.mode.sensitivity
+        x, y = sens.crosshair_x, sens.crosshair_y
+        tx, ty = min(target_positions(self.mode), key=lambda t: (t[0] - x) ** 2 + (t[1] - y) ** 2)
+        dx, dy = tx - x, ty - y
+        distance = math.hypot(dx, dy)
+        
+        if distance < self.mode.target_radius / 2 or self.random.random() < 0.02:
+            pygame.event.post(pygame.event.Event(
+                pygame.MOUSEBUTTONDOWN, pos=(int(x), int(y)), button=1))
+            return
+        
+        step = min(distance, self.speed * (0.5 + self.random.random()))
+        rel = (round(dx / distance * step / sens.sensitivity),
+               round(dy / distance * step / sens.sensitivity))
+        pygame.event.post(pygame.event.Event(
+            pygame.MOUSEMOTION, pos=(int(x), int(y)), rel=rel, buttons=(0, 0, 0)))
+
+def run_mode(name, screen, frames, track_allocations=False):
+    """运行一个游戏模式指定的帧数，返回统计数据"""
+    settings = bench_settings()
+    mode = create_mode(name, screen, settings)
+    mouse = ScriptedMouse(mode)
+    frame_ns = []
+    # 每帧分配的字节数: 这一帧内已追踪内存的最高值减去帧开始时的值，
+    # 包括帧内分配后又释放的临时对象(同一帧内先释放再分配的部分不重复计算)
+    alloc_bytes = []
+    frame_start_bytes = [0]
+    snapshots = []
+    last = [time.perf_counter_ns()]
+    
+    def handle_events():
+        now = time.perf_counter_ns()
+        frame_ns.append(now - last[0])
+        last[0] = now
+        if track_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            alloc_bytes.append(peak - frame_start_bytes[0])
+            tracemalloc.reset_peak()
+            frame_start_bytes[0] = current
+            # 第一帧包含初始化，从第二帧开始比较
+            if len(frame_ns) == 2:
+                snapshots.append(tracemalloc.take_snapshot())
+                current, _ = tracemalloc.get_traced_memory()
+                tracemalloc.reset_peak()
+                frame_start_bytes[0] = current
+        mouse.post_events()
+        return mode._handle_events()
+    
+    # 与模式的计时使用同一个时钟，否则第一次更新就会判定为时间到
+    mode.start_time = mode.clock.now_ms()
+    try:
+        mode.loop.run(handle_events, mode._update, mode._draw, max_frames=frames)
+    finally:
+        mode.sensitivity.cleanup()
+    if not mode.shots_fired:
+        raise RuntimeError(f"{name}: 运行 {frames} 帧没有任何射击，结果不可信")
+    
+    # 第一帧的时间包含初始化，不计入
+    result = summarize(frame_ns[1:])
+    result["score"] = mode.score
+    result["hits"] = mode.hits
+    result["shots"] = mode.shots_fired
+    if track_allocations:
+        # 前后两个快照的差: 这些帧留下来、没有释放的内存，不包括本文件记录的帧时间
+        snapshots.append(tracemalloc.take_snapshot())
+        exclude = [tracemalloc.Filter(False, __file__)]
+        stats = snapshots[1].filter_traces(exclude).compare_to(snapshots[0].filter_traces(exclude), "filename")
+        measured = len(frame_ns) - 1
+        result["retained_bytes_per_frame"] = sum(stat.size_diff for stat in stats) / measured
+        result["retained_blocks_per_frame"] = sum(stat.count_diff for stat in stats) / measured
+        # alloc_bytes[i] 是第 i 帧的分配量，去掉第一帧和拍快照的那一帧
+        result["alloc_bytes_per_frame"] = sum(alloc_bytes[2:]) / max(1, len(alloc_bytes) - 2)
+    return result
+
+def run_session(name, screen, headless=True):
+    """用模拟时钟完整跑一局(60秒游戏时间)，返回实际耗时和成绩
+    headless 为True时只运行输入和逻辑，不渲染
+    """
+    from src.utils.clock import SimulatedClock
+    settings = bench_settings()
+    clock = SimulatedClock()
+    mode = create_mode(name, screen, settings, clock=clock)
+    mode.loop.headless = headless
+    mouse = ScriptedMouse(mode)
+    
+    def handle_events():
+        if mode.game_over:
+            return True
+        mouse.post_events()
+        return mode._handle_events()
+    
+    mode.start_time = clock.now_ms()
+    start = time.perf_counter_ns()
+    try:
+        mode.loop.run(handle_events, mode._update, mode._draw)
+    finally:
+        mode.sensitivity.cleanup()
+    return {
+        "wall_ms": (time.perf_counter_ns() - start) / 1e6,
+        "simulated_s": clock.now_ms() / 1000,
+        "frames": mode.loop.frames,
+        "score": mode.score,
+    }
+
+def run_menu(frames):
+    """主菜单: 每帧用脚本化的鼠标移动和点击选择模式(每60帧换一个)，
+    经过菜单自己的事件处理后重绘(包含历史图表)
+    """
+    from src.main_menu import MainMenu
+    menu = MainMenu()
+    frame_ns = []
+    selected = set()
+    for i in range(frames):
+        index = i // 60 % len(menu.game_modes)
+        # 模式列表中第 index 项的中间
+        pos = (150, 220 + index * 60)
+        pygame.event.post(pygame.event.Event(
+            pygame.MOUSEMOTION, pos=pos, rel=(0, 0), buttons=(0, 0, 0)))
+        pygame.event.post(pygame.event.Event(pygame.MOUSEBUTTONDOWN, pos=pos, button=1))
+        start = time.perf_counter_ns()
+        menu._check_events()
+        if menu.needs_redraw:
+            menu._update_screen()
+            menu.needs_redraw = False
+        frame_ns.append(time.perf_counter_ns() - start)
+        selected.add(menu.selected_mode)
+    expected = set(menu.game_modes[:(frames - 1) // 60 + 1])
+    if selected != expected:
+        raise RuntimeError(f"MainMenu: 脚本点击没有选中预期的模式 {sorted(expected)}，实际 {sorted(selected)}")
+    return summarize(frame_ns)
+
+def run_score_io(records):
+    """ScoreManager 的保存和加载耗时
+    保存的耗时包含后台线程把所有记录写入磁盘，而不只是提交任务
+    """
+    from src.utils.score_manager import ScoreManager
+    results = {}
+    for backend in ("json", "sqlite"):
+        manager = ScoreManager(backend=backend)
+        start = time.perf_counter_ns()
+        for i in range(records):
+            manager.save_score("Bench", i * 100, 80.0)
+        manager.worker.flush()
+        save_ns = time.perf_counter_ns() - start
+        
+        start = time.perf_counter_ns()
+        manager.load_scores()
+        manager.get_mode_history("Bench")
+        load_ns = time.perf_counter_ns() - start
+        results[backend] = {
+            "save_us_per_record": save_ns / records / 1000,
+            "load_ms": load_ns / 1e6,
+        }
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(old, new, path=()):
+    """打印两次结果中数值的变化"""
+    for key, value in new.items():
+        if isinstance(value, dict):
+            compare(old.get(key, {}), value, path + (key,))
+        elif isinstance(value, (int, float)) and isinstance(old.get(key), (int, float)):
+            before = old[key]
+            change = (value - before) / before * 100 if before else 0.0
+            print(f"{'.'.join(path + (key,)):<50} {before:>12.3f} -> {value:>12.3f} ({change:+.1f}%)")
+
+def main():
+    parser = argparse.ArgumentParser(description="AimLab 无界面基准测试")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--records", type=int, default=200)
+    parser.add_argument("--out")
+    parser.add_argument("--compare")
+    args = parser.parse_args()
+    
+    commit = git_commit()
+    out = os.path.abspath(args.out or os.path.join(ROOT, "benchmarks", "results", f"{commit}.json"))
+    baseline = os.path.abspath(args.compare) if args.compare else None
+    
+    # 在临时目录中运行，不影响真实的成绩数据
+    workdir = tempfile.mkdtemp(prefix="aimlab-bench-")
+    os.chdir(workdir)
+    
+    pygame.init()
+    settings = Settings()
+    screen = pygame.display.set_mode((settings.screen_width, settings.screen_height))
+    
+    results = {"commit": commit, "frames": args.frames, "modes": {}}
+    for name in MODES:
+        results["modes"][name] = run_mode(name, screen, args.frames)
+        # 单独再跑一遍统计内存分配，tracemalloc 会拖慢帧时间
+        tracemalloc.start()
+        allocs = run_mode(name, screen, min(args.frames, 200), track_allocations=True)
+        tracemalloc.stop()
+        results["modes"][name]["alloc_bytes_per_frame"] = allocs["alloc_bytes_per_frame"]
+        results["modes"][name]["retained_bytes_per_frame"] = allocs["retained_bytes_per_frame"]
+        results["modes"][name]["retained_blocks_per_frame"] = allocs["retained_blocks_per_frame"]
+        print(f"{name:>10}: {results['modes'][name]['fps']:8.1f} FPS  "
+              f"p99 {results['modes'][name]['p99_ms']:.2f} ms")
+        results["modes"][name]["session"] = run_session(name, screen)
+        print(f"{'':>10}  完整一局(模拟时间，不渲染): {results['modes'][name]['session']['wall_ms']:.0f} ms")
+    
+    results["menu"] = run_menu(args.frames)
+    print(f"{'MainMenu':>10}: {results['menu']['fps']:8.1f} FPS  p99 {results['menu']['p99_ms']:.2f} ms")
+    results["score_io"] = run_score_io(args.records)
+    pygame.quit()
+    
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"结果已保存到 {out}")
+    
+    if baseline:
+        with open(baseline) as f:
+            compare(json.load(f), results)
+
+if __name__ == "__main__":
+    main()
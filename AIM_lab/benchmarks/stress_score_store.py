@@ -0,0 +1,89 @@
+"""多个游戏实例共用 data 目录时的写入压力测试
+
+同时启动多个进程，每个进程用自己的 ScoreManager 向同一个临时 data 目录保存成绩，
+中途反复重新加载(模拟回到主菜单)，并把合并阈值调得很低以频繁触发日志合并。
+全部结束后检查每一条记录都在并且没有重复，有丢失时以非零状态退出。
+
+在 AIM_lab 目录下运行:
+    python -m benchmarks.stress_score_store [进程数] [每个进程的记录数] [json|sqlite]
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+MODE = "Stress"
+
+def writer(directory, backend, writer_id, count):
+    """一个游戏实例: 连续保存 count 局成绩"""
+    os.chdir(directory)
+    from src.utils.score_manager import ScoreManager
+    manager = ScoreManager(backend=backend)
+    manager.journal.compact_threshold = 10
+    for i in range(count):
+        # 分数编码了进程号和序号，检查时可以找出丢失的是哪一条
+        manager.save_score(MODE, writer_id * 1_000_000 + i, 50.0)
+        if i % 25 == 24:
+            manager.load_scores()
+    manager.worker.flush()
+    manager.journal.wait()
+
+def run(backend, processes, count):
+    """返回 (耗时, 丢失条数, 重复条数, 统计中的记录数)"""
+    from src.utils.score_manager import ScoreManager
+    
+    with tempfile.TemporaryDirectory() as directory:
+        # 与游戏实例一样使用独立的进程，而不是复制当前进程
+        context = multiprocessing.get_context("spawn")
+        workers = [
+            context.Process(target=writer, args=(directory, backend, writer_id, count))
+            for writer_id in range(processes)
+        ]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        elapsed = time.perf_counter() - start
+        failed = [worker.exitcode for worker in workers if worker.exitcode != 0]
+        if failed:
+            raise RuntimeError(f"{len(failed)} 个写入进程异常退出: {failed}")
+        
+        cwd = os.getcwd()
+        os.chdir(directory)
+        try:
+            manager = ScoreManager(backend=backend)
+            scores = [r["score"] for r in manager.get_mode_history(MODE)]
+            summary_count = manager.get_mode_summary(MODE)["count"]
+            if manager.db:
+                manager.db.close()
+        finally:
+            os.chdir(cwd)
+    
+    expected = {w * 1_000_000 + i for w in range(processes) for i in range(count)}
+    lost = len(expected - set(scores))
+    duplicated = len(scores) - len(set(scores))
+    return elapsed, lost, duplicated, summary_count
+
+def main():
+    processes = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    backends = sys.argv[3:4] or ["json", "sqlite"]
+    
+    ok = True
+    for backend in backends:
+        elapsed, lost, duplicated, summary_count = run(backend, processes, count)
+        total = processes * count
+        passed = not lost and not duplicated and summary_count == total
+        ok = ok and passed
+        print(f"{backend:>7}: {processes} 个进程 x {count} 局，{elapsed:.2f} s，"
+              f"丢失 {lost}，重复 {duplicated}，统计记录数 {summary_count}/{total}")
+    print("OK" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,16 @@
-from src.main_menu import MainMenu
+import os
+import sys
+# 最先导入，记录启动时间
+from src.utils import startup
 
 if __name__ == "__main__":
+    # --profile: 开启逐帧性能分析，退出时导出Chrome trace
+    if "--profile" in sys.argv:
+        os.environ["AIM_PROFILE"] = "1"
+    # --startup-profile: 统计启动时各模块的导入耗时和首帧时间，打印后退出
+    if "--startup-profile" in sys.argv:
+        sys.exit(startup.profile_startup(__file__))
+    
+    from src.main_menu import MainMenu
     menu = MainMenu()
     menu.run() 
\ No newline at end of file
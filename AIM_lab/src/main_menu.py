@@ -2,6 +2,10 @@ import pygame
 import sys
 from src.settings import Settings
 from src.ui.button import Button
+from src.utils.assets import render_text
+from src.utils.events import wait_events, needs_redraw
+from src.utils.startup import first_frame_shown
+from src.modes import MODES, create_mode
 
 class MainMenu:
     def __init__(self):
@@ -39,35 +43,51 @@ class MainMenu:
             settings_size
         )
         
-        # 游戏模式列表
-        self.game_modes = [
-            "SixShot",
-            "QuickShot",
-            "HeadShot",
-        ]
+        # 游戏模式列表，模式的代码在开始游戏时才导入
+        self.game_modes = list(MODES)
         
         # 添加选中的游戏模式
         self.selected_mode = None
         
+        # 菜单内容是静态的，只在状态改变时重绘
+        self.needs_redraw = True
+        # 没有事件时最长等待的毫秒数，留给需要定时刷新的内容
+        self.idle_timeout = 500
+        
         # 添加记分管理器
         from src.utils.score_manager import ScoreManager
-        self.score_manager = ScoreManager()
+        self.score_manager = ScoreManager.from_settings(self.settings)
+        # 在后台并行绘制所有模式的图表，选中模式时不用再等
+        self.score_manager.prerender_graphs(self.game_modes)
+        # 有图表正在绘制时，每隔多少毫秒检查一次
+        self.graph_poll_ms = 30
     
     def run(self):
-        """主游戏循环"""
+        """主游戏循环，没有输入时阻塞等待，不再空转"""
         while True:
+            # 先绘制再等待事件，第一帧不用等到有输入或超时
+            if self.needs_redraw:
+                self._update_screen()
+                self.needs_redraw = False
+                first_frame_shown()
             self._check_events()
-            self._update_screen()
     
     def _check_events(self):
         """响应按键和鼠标事件"""
-        for event in pygame.event.get():
+        pending = self.score_manager.graphs_pending()
+        events = wait_events(self.graph_poll_ms if pending else self.idle_timeout)
+        if needs_redraw(events):
+            self.needs_redraw = True
+        # 后台画好的图表替换占位图
+        if pending and self.score_manager.poll_graphs():
+            self.needs_redraw = True
+        for event in events:
             if event.type == pygame.QUIT:
                 sys.exit()
             elif event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-                self._check_button_clicks(mouse_pos)
-                self._check_mode_selection(mouse_pos)
+                # 使用点击事件中的位置，而不是处理事件时光标所在的位置
+                self._check_button_clicks(event.pos)
+                self._check_mode_selection(event.pos)
     
     def _check_button_clicks(self, mouse_pos):
         """检查按钮点击"""
@@ -88,17 +108,8 @@ class MainMenu:
         """更新屏幕内容"""
         self.screen.fill(self.settings.bg_color)
         
-        # 绘制标题
-        try:
-            font = pygame.font.Font("assets/fonts/simsunb.ttf", 74)
-            mode_font = pygame.font.Font("assets/fonts/simsunb.ttf", 32)
-        except FileNotFoundError:
-            print("警告：找不到字体文件 assets/fonts/simsunb.ttf")
-            font = pygame.font.Font(None, 74)
-            mode_font = pygame.font.Font(None, 32)
-        
         # 绘制游戏标题    
-        title = font.render("AimLab", True, (255, 255, 255))
+        title = render_text("AimLab", 74, (255, 255, 255))
         title_rect = title.get_rect(center=(self.settings.screen_width // 2, 100))
         self.screen.blit(title, title_rect)
         
@@ -109,7 +120,7 @@ class MainMenu:
             if mode == self.selected_mode:
                 color = (255, 200, 0)  # 选中的模式示为金色
                 
-            mode_text = mode_font.render(mode, True, color)
+            mode_text = render_text(mode, 32, color)
             mode_rect = mode_text.get_rect(
                 left=50,
                 top=200 + i * 60
@@ -120,8 +131,10 @@ class MainMenu:
         self.play_button.draw()
         self.settings_button.draw()
         
-        # 如果选择了模式，显示历史记录图表
+        # 如果选择了模式，显示统计数据和历史记录图表
         if self.selected_mode:
+            self._draw_summary(self.selected_mode, top=200 + len(self.game_modes) * 60 + 40)
+            
             score_graph, accuracy_graph = self.score_manager.create_history_graph(self.selected_mode)
             if score_graph and accuracy_graph:
                 # 在右侧显示分数图表
@@ -138,34 +151,45 @@ class MainMenu:
         
         pygame.display.flip()
     
+    def _draw_summary(self, mode, top):
+        """在模式列表下方显示该模式的统计数据"""
+        summary = self.score_manager.get_mode_summary(mode)
+        if not summary["count"]:
+            return
+        lines = [
+            f"Runs: {summary['count']}",
+            f"Best: {summary['best']}",
+            f"Average: {summary['mean']:.0f} ± {summary['stddev']:.0f}",
+            f"Recent: {summary['ewma']:.0f}",
+        ]
+        # 第一局没有可以比较的记录
+        if summary["last_rank"] is not None:
+            lines.append(f"Last run: better than {summary['last_rank'] * 100:.0f}% of runs")
+        for i, line in enumerate(lines):
+            text = render_text(line, 24, (200, 200, 200))
+            self.screen.blit(text, (50, top + i * 30))
+    
     def _start_game(self):
         """开始游戏"""
         if not self.selected_mode:
             return
             
-        # 根据选择的模式启动相应的游戏
-        from src.modes.six_shot import SixShot
-        from src.modes.quick_shot import QuickShot
-        from src.modes.head_shot import HeadShot
+        # 根据选择的模式启动相应的游戏，第一次使用时才导入
+        # 游戏模式与主菜单共用记分管理器
+        game_mode = create_mode(self.selected_mode, self.screen, self.settings,
+                                score_manager=self.score_manager)
         
-        game_mode = None
-        if self.selected_mode == "SixShot":
-            game_mode = SixShot(self.screen, self.settings)
-        elif self.selected_mode == "QuickShot":
-            game_mode = QuickShot(self.screen, self.settings)
-        elif self.selected_mode == "HeadShot":
-            game_mode = HeadShot(self.screen, self.settings)
-            
-        if game_mode:
-            # 运行游戏，如果返回False则退出程序
-            result = game_mode.run()
-            # 重新加载分数管理器
-            self.score_manager.load_scores()
-            if not result:
-                sys.exit()
+        # 运行游戏，如果返回False则退出程序
+        result = game_mode.run()
+        # 重新加载分数，包括共用 data 目录的其他实例保存的记录
+        self.score_manager.load_scores()
+        if not result:
+            sys.exit()
+        self.needs_redraw = True
     
     def _open_settings(self):
         """打开设置界面"""
         from src.ui.settings_menu import SettingsMenu
         settings_menu = SettingsMenu(self.screen, self.settings)
-        settings_menu.run() 
\ No newline at end of file
+        settings_menu.run()
+        self.needs_redraw = True 
\ No newline at end of file
@@ -1 +1,22 @@
-# 这个文件可以为空 
\ No newline at end of file
+"""游戏模式注册表
+
+模式的代码只在第一次开始该模式时导入，启动时不需要加载。
+新增模式时在 MODES 中添加一行: 名称 -> (模块, 类名)
+"""
+import importlib
+
+# 按菜单中的显示顺序排列
+MODES = {
+    "SixShot": ("src.modes.six_shot", "SixShot"),
+    "QuickShot": ("src.modes.quick_shot", "QuickShot"),
+    "HeadShot": ("src.modes.head_shot", "HeadShot"),
+}
+
+def get_mode_class(name):
+    """导入并返回模式的类"""
+    module_name, class_name = MODES[name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+def create_mode(name, screen, settings, clock=None, score_manager=None):
+    """按名称创建游戏模式，score_manager 为None时模式自己创建"""
+    return get_mode_class(name)(screen, settings, clock=clock, score_manager=score_manager)
@@ -0,0 +1,227 @@
+import pygame
+from src.utils.assets import render_text
+from src.utils.events import wait_events, needs_redraw
+from src.utils.replay import create_recorder
+
+# 结束界面有图表正在绘制时，每隔多少毫秒检查一次
+GRAPH_POLL_MS = 30
+
+class BaseMode:
+    """游戏模式共用的流程: 主循环、输入事件、计时、重新开始、绘制和结束界面
+    
+    子类在 __init__ 中创建 clock、sampler、loop、sensitivity、recorder、
+    score_manager、background、renderer、crosshair 和结束界面的按钮，并实现:
+        spawn_targets()             开局时生成目标
+        _handle_click(pos, time_ns) 处理一次点击，time_ns 为点击事件到达的时间
+        _draw_targets()             绘制目标，返回变化区域的矩形列表
+    """
+    def run(self):
+        self.start_time = self.clock.now_ms()
+        
+        try:
+            # 使用共用的主循环：固定步长更新，渲染帧率由设置决定
+            return self.loop.run(self._handle_events, self._update, self._draw)
+        finally:
+            # 退出时恢复鼠标光标
+            self.sensitivity.cleanup()
+            self.recorder.close()
+    
+    def _poll_events(self):
+        """获取带时间戳的输入事件 [(纳秒, 事件)]，按发生顺序排列
+        结束界面没有输入时阻塞等待而不是空转
+        """
+        events = self.sampler.drain()
+        if not self.game_over or self.needs_redraw:
+            return events
+        # 历史图表在子进程中绘制时缩短等待，画好后立即重绘替换占位图
+        pending = self.score_manager.graphs_pending()
+        if not events and not self.clock.simulated:
+            timeout = GRAPH_POLL_MS if pending else 500
+            events = [(self.clock.now_ns(), event) for event in wait_events(timeout)]
+        self.needs_redraw = needs_redraw(event for _, event in events)
+        if pending and self.score_manager.poll_graphs():
+            self.needs_redraw = True
+        return events
+    
+    def _reset_game(self):
+        """重置游戏"""
+        self.score = 0
+        self.shots_fired = 0
+        self.hits = 0
+        self.time_left = self.game_duration
+        self.game_over = False
+        # 先生成新的目标序列，生成的时间不计入这一局
+        self.spawn_sequence.restart()
+        self.recorder.close()
+        self.recorder = create_recorder(self.settings.replay_dir, self.name, self.clock.now_ns(),
+                                        self.target_radius)
+        self.start_time = self.clock.now_ms()
+        self.spawn_targets()
+        # 结束界面显示了光标，重新隐藏并锁定，回到相对鼠标模式
+        self.sensitivity.start()
+    
+    def _update(self, dt=None):
+        """更新游戏状态，由主循环以固定步长调用"""
+        if not self.game_over:
+            # 更新准心位置
+            self.profiler.begin("sensitivity")
+            self.crosshair_x, self.crosshair_y = self.sensitivity.update()
+            self.profiler.end("sensitivity")
+            self.recorder.crosshair(self.clock.now_ns(), self.crosshair_x, self.crosshair_y)
+            
+            # 更新时间
+            current_time = self.clock.now_ms()
+            elapsed_time = (current_time - self.start_time) // 1000
+            self.time_left = max(0, self.game_duration - elapsed_time)
+            
+            if self.time_left <= 0:
+                self.game_over = True
+                self.needs_redraw = True
+                # 保存分数
+                accuracy = (self.hits / self.shots_fired * 100) if self.shots_fired > 0 else 0
+                self.score_manager.save_score(self.name, self.score, accuracy)
+                self.recorder.close()
+    
+    def _crosshair_at_click(self):
+        """积分到当前事件为止的鼠标移动，返回精确的准心位置"""
+        self.crosshair_x, self.crosshair_y = self.sensitivity.update()
+        return self.sensitivity.crosshair_x, self.sensitivity.crosshair_y
+    
+    def _crosshair_pos(self, alpha):
+        """准心的绘制位置: 积分到现在为止的所有鼠标移动，画在最新的位置
+        准心由输入直接驱动，不在逻辑更新之间插值，画出的位置就是点击时判定的位置；
+        alpha 只用于插值模拟的状态(例如回放)
+        """
+        x, y = self._crosshair_at_click()
+        return int(x), int(y)
+    
+    def _handle_events(self):
+        """处理输入事件"""
+        for timestamp, event in self._poll_events():
+            # 鼠标移动交给灵敏度管理器累加
+            self.sensitivity.handle_event(event)
+            if event.type == pygame.QUIT:
+                return False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    return True
+                if event.key == pygame.K_r and self.game_over:
+                    self._reset_game()
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                mouse_pos = pygame.mouse.get_pos()
+                if self.game_over:
+                    if self.restart_button.rect.collidepoint(mouse_pos):
+                        self._reset_game()
+                    elif self.menu_button.rect.collidepoint(mouse_pos):
+                        pygame.mouse.set_visible(True)  # 确保返回菜单时显示鼠标
+                        return True
+                else:
+                    # 按事件顺序处理：先积分这次点击之前的所有移动，
+                    # 再用点击那一刻的准心位置判定，而不是上一帧的位置
+                    self._handle_click(self._crosshair_at_click(), timestamp)
+            if event.type == pygame.MOUSEWHEEL:
+                sens = self.sensitivity.adjust_sensitivity(event.y)
+                print(f"Sensitivity: {sens:.1f}")
+        return None
+    
+    def _draw(self, alpha=1.0):
+        """绘制游戏画面，alpha 为主循环传入的插值系数"""
+        # 结束界面是静态的，没有输入时不重绘
+        if self.game_over and not self.needs_redraw:
+            return
+        
+        # 游戏进行中且开启了脏矩形渲染时，只重绘变化的区域
+        dirty = self.renderer is not None and not self.game_over
+        if dirty:
+            self.renderer.begin()
+        else:
+            # 绘制预先生成的背景和网格
+            self.background.draw(self.screen)
+        rects = []
+        
+        # 绘制目标
+        if not self.game_over:
+            rects.extend(self._draw_targets())
+        
+        rects.extend(self._draw_hud())
+        
+        if self.game_over:
+            self._draw_game_over()
+        else:
+            # 游戏进行中，绘制准心
+            rects.append(self.crosshair.draw(self._crosshair_pos(alpha)))
+        
+        # 性能分析的帧时间曲线
+        rects.append(self.profiler.draw_overlay(self.screen))
+        self._present(dirty, rects)
+        self.needs_redraw = False
+    
+    def _accuracy(self):
+        return (self.hits / self.shots_fired * 100) if self.shots_fired > 0 else 0
+    
+    def _draw_hud(self):
+        """绘制分数和时间，返回变化区域的矩形列表"""
+        score_text = f"Score: {self.score} | Accuracy: {self._accuracy():.1f}%"
+        time_text = f"Time: {self.time_left}s"
+        
+        score_surface = render_text(score_text, 32, (255, 255, 255))
+        time_surface = render_text(time_text, 32, (255, 255, 255))
+        
+        return [self.screen.blit(score_surface, (20, 20)),
+                self.screen.blit(time_surface, (20, 60))]
+    
+    def _draw_game_over(self):
+        """绘制结束界面: 最终成绩、历史记录图表和按钮"""
+        # 显示鼠标光标，隐藏准心
+        pygame.mouse.set_visible(True)
+        
+        # 绘制半透明背景
+        overlay = pygame.Surface((self.settings.screen_width, self.settings.screen_height))
+        overlay.fill((0, 0, 0))
+        overlay.set_alpha(128)
+        self.screen.blit(overlay, (0, 0))
+        
+        # 绘制结束文本
+        game_over_text = render_text("Game Over!", 32, (255, 255, 255))
+        text_rect = game_over_text.get_rect(center=(self.settings.screen_width // 2, 80))
+        self.screen.blit(game_over_text, text_rect)
+        
+        # 绘制最终分数
+        final_score = render_text(f"Final Score: {self.score}", 32, (255, 255, 255))
+        score_rect = final_score.get_rect(center=(self.settings.screen_width // 2, 130))
+        self.screen.blit(final_score, score_rect)
+        
+        accuracy_text = render_text(f"Accuracy: {self._accuracy():.1f}%", 32, (255, 255, 255))
+        accuracy_rect = accuracy_text.get_rect(center=(self.settings.screen_width // 2, 180))
+        self.screen.blit(accuracy_text, accuracy_rect)
+        
+        # 绘制历史记录图表
+        score_graph, accuracy_graph = self.score_manager.create_history_graph(self.name)
+        if score_graph and accuracy_graph:
+            # 绘制分数图表
+            graph_rect = score_graph.get_rect()
+            graph_rect.centerx = self.settings.screen_width // 2
+            graph_rect.top = 230
+            self.screen.blit(score_graph, graph_rect)
+            
+            # 绘制准确率图表
+            acc_rect = accuracy_graph.get_rect()
+            acc_rect.centerx = self.settings.screen_width // 2
+            acc_rect.top = graph_rect.bottom + 20
+            self.screen.blit(accuracy_graph, acc_rect)
+        
+        # 绘制按钮
+        self.restart_button.draw()
+        self.menu_button.draw()
+    
+    def _present(self, dirty, rects):
+        """把这一帧显示到屏幕上，dirty 为True时只更新 rects 中的区域"""
+        self.profiler.begin("flip")
+        if dirty:
+            self.renderer.present(rects)
+        else:
+            if self.renderer:
+                # 结束界面覆盖了整个屏幕，重新开始时需要整屏重绘
+                self.renderer.invalidate()
+            pygame.display.flip()
+        self.profiler.end("flip")
@@ -1,10 +1,18 @@
 import pygame
-import random
-import math
 from src.ui.button import Button
+from src.ui.background import Background
+from src.ui.dirty_rects import DirtyRectRenderer
+from src.utils.game_loop import GameLoop
+from src.utils.spatial_grid import TargetGrid
+from src.utils.spawn_sequence import SpawnSequence
+from src.utils.clock import RealClock
+from src.utils.input_sampler import InputSampler
+from src.utils.profiler import get_profiler
+from src.utils.replay import create_recorder
+from src.modes.base_mode import BaseMode
 
-class QuickShot:
-    def __init__(self, screen, settings):
+class QuickShot(BaseMode):
+    def __init__(self, screen, settings, clock=None, score_manager=None):
         self.screen = screen
         self.settings = settings
         self.name = "QuickShot"
@@ -13,12 +21,26 @@ class QuickShot:
         self.grid_size = 50
         self.grid_color = (40, 40, 40)
         self.bg_color = (70, 70, 70)
+        self.background = Background(self.bg_color, self.grid_size, self.grid_color)
+        self.renderer = DirtyRectRenderer(screen, self.background) if settings.dirty_rects else None
         
         # 目标小球设置
         self.targets = []
         self.target_radius = 50
         self.target_color = (255, 50, 50)
         self.max_targets = 3  # 只有三个球
+        # 目标生成区域 (左, 上, 右, 下)，避免小球生成在屏幕边缘
+        margin = 100
+        self.spawn_bounds = (margin, margin,
+                             self.settings.screen_width - margin,
+                             self.settings.screen_height - margin)
+        # 存活目标的网格索引，格子边长即目标之间的最小间距
+        self.target_grid = TargetGrid(self.target_radius * 4)
+        # 目标生成序列，开局前按种子生成好，计时开始后只需按顺序取位置
+        self.spawn_sequence = SpawnSequence(
+            self.spawn_bounds, self.target_grid.cell_size,
+            seed=settings.spawn_seed, cache_dir=settings.spawn_cache_dir
+        )
         
         # 计分
         self.score = 0
@@ -32,6 +54,21 @@ class QuickShot:
         self.time_left = self.game_duration
         self.start_time = None
         self.game_over = False
+        # 结束界面是静态的，只在有输入时重绘
+        self.needs_redraw = True
+        
+        # 时间来源，测试和模拟时可以传入 SimulatedClock
+        self.clock = clock or RealClock()
+        # 录像，关闭时为空操作
+        self.recorder = create_recorder(settings.replay_dir, self.name, self.clock.now_ns(),
+                                        self.target_radius)
+        
+        # 主循环，两帧之间持续采样输入
+        self.sampler = InputSampler(clock=self.clock)
+        self.loop = GameLoop(settings.sim_rate, settings.max_fps,
+                             sampler=self.sampler, clock=self.clock)
+        # 性能分析，未开启时为空操作
+        self.profiler = get_profiler()
         
         # 隐藏鼠标光标
         pygame.mouse.set_visible(False)
@@ -46,11 +83,13 @@ class QuickShot:
         
         # 添加灵敏度管理器
         from src.utils.sensitivity import SensitivityManager
-        self.sensitivity = SensitivityManager()
+        self.sensitivity = SensitivityManager(backend=settings.input_backend)
         
-        # 添加记分管理器
-        from src.utils.score_manager import ScoreManager
-        self.score_manager = ScoreManager()
+        # 记分管理器，从主菜单启动时与主菜单共用
+        if score_manager is None:
+            from src.utils.score_manager import ScoreManager
+            score_manager = ScoreManager.from_settings(settings)
+        self.score_manager = score_manager
         
         # 添加结束界面按钮
         button_width = 200
@@ -80,224 +119,47 @@ class QuickShot:
     def spawn_targets(self):
         """生成目标小球"""
         self.targets.clear()
-        margin = 100
-        
-        for _ in range(self.max_targets):
-            while True:
-                x = random.randint(margin, self.settings.screen_width - margin)
-                y = random.randint(margin, self.settings.screen_height - margin)
-                
-                # 检查是否与其他目标重叠
-                overlap = False
-                for target in self.targets:
-                    distance = math.sqrt((x - target[0])**2 + (y - target[1])**2)
-                    if distance < self.target_radius * 4:
-                        overlap = True
-                        break
-                
-                if not overlap:
-                    self.targets.append([x, y])
-                    break
+        self.target_grid.clear()
+        
+        for i in range(self.max_targets):
+            # 优先使用生成序列，被占用时在网格中查找空位，放不下时直接报错而不是卡死
+            position = (self.spawn_sequence.next(self.target_grid) or
+                        self.target_grid.find_position(self.spawn_bounds, self.spawn_sequence.random))
+            if position is None:
+                raise ValueError(
+                    f"{self.name}: 生成区域放不下 {self.max_targets} 个间距为 "
+                    f"{self.target_grid.cell_size} 的目标"
+                )
+            self.targets.append(list(position))
+            self.target_grid.insert(i, *position)
+            self.recorder.target(self.clock.now_ns(), i, *position)
     
-    def run(self):
-        running = True
-        clock = pygame.time.Clock()
-        self.start_time = pygame.time.get_ticks()
-        
-        try:
-            while running:
-                for event in pygame.event.get():
-                    if event.type == pygame.QUIT:
-                        return False
-                    if event.type == pygame.KEYDOWN:
-                        if event.key == pygame.K_ESCAPE:
-                            return True
-                        if event.key == pygame.K_r and self.game_over:
-                            self._reset_game()
-                    if event.type == pygame.MOUSEBUTTONDOWN and not self.game_over:
-                        self._handle_click((self.crosshair_x, self.crosshair_y))
-                    # 添加鼠标滚轮调整灵敏度
-                    if event.type == pygame.MOUSEWHEEL:
-                        sens = self.sensitivity.adjust_sensitivity(event.y)
-                        print(f"Sensitivity: {sens:.1f}")
-                
-                self._update()
-                self._draw()
-                clock.tick(60)
-        finally:
-            # 退出时恢复鼠标光标和灵敏度
-            self.crosshair.show()
-            self.sensitivity.reset_sensitivity()
-            
-        return True
-    
-    def _reset_game(self):
-        """重置游戏"""
-        self.score = 0
-        self.shots_fired = 0
-        self.time_left = self.game_duration
-        self.game_over = False
-        self.start_time = pygame.time.get_ticks()
-        self.spawn_targets()
-    
-    def _handle_click(self, pos):
-        """处理鼠标点击"""
+    def _handle_click(self, pos, time_ns):
+        """处理鼠标点击，time_ns 为点击事件到达的时间"""
         self.shots_fired += 1
         mouse_x, mouse_y = pos
-        hit = False
-        
-        for i, (x, y) in enumerate(self.targets):
-            distance = math.sqrt((mouse_x - x)**2 + (mouse_y - y)**2)
-            if distance <= self.target_radius:
-                self.score += self.hit_score
-                self.hits += 1  # 记录击中
-                hit = True
-                self._respawn_target(i)
-                break
         
-        if not hit:
+        index = self.target_grid.hit_test(mouse_x, mouse_y, self.target_radius)
+        self.recorder.shot(time_ns, mouse_x, mouse_y, index is not None)
+        if index is not None:
+            self.score += self.hit_score
+            self.hits += 1  # 记录击中
+            self._respawn_target(index, time_ns)
+        else:
             self.score = max(0, self.score - self.miss_penalty)
     
-    def _respawn_target(self, index):
-        """重新生成单个目标的位置"""
-        margin = 100
-        while True:
-            x = random.randint(margin, self.settings.screen_width - margin)
-            y = random.randint(margin, self.settings.screen_height - margin)
-            
-            overlap = False
-            for i, target in enumerate(self.targets):
-                if i != index:
-                    distance = math.sqrt((x - target[0])**2 + (y - target[1])**2)
-                    if distance < self.target_radius * 4:
-                        overlap = True
-                        break
-            
-            if not overlap:
-                self.targets[index] = [x, y]
-                break
-    
-    def _update(self):
-        """更新游戏状态"""
-        if not self.game_over:
-            # 更新准心位置
-            self.crosshair_x, self.crosshair_y = self.sensitivity.update()
-            
-            # 更新时间
-            current_time = pygame.time.get_ticks()
-            elapsed_time = (current_time - self.start_time) // 1000
-            self.time_left = max(0, self.game_duration - elapsed_time)
-            
-            if self.time_left <= 0:
-                self.game_over = True
-                # 保存分数
-                accuracy = (self.hits / self.shots_fired * 100) if self.shots_fired > 0 else 0
-                self.score_manager.save_score(self.name, self.score, accuracy)
-    
-    def _draw(self):
-        """绘制游戏画面"""
-        self.screen.fill(self.bg_color)
-        
-        # 绘制网格
-        for x in range(0, self.settings.screen_width, self.grid_size):
-            pygame.draw.line(self.screen, self.grid_color, (x, 0), 
-                           (x, self.settings.screen_height))
-        for y in range(0, self.settings.screen_height, self.grid_size):
-            pygame.draw.line(self.screen, self.grid_color, (0, y), 
-                           (self.settings.screen_width, y))
-        
-        # 绘制目标
-        if not self.game_over:
-            for x, y in self.targets:
-                pygame.draw.circle(self.screen, self.target_color, (x, y), 
-                                 self.target_radius)
-        
-        # 绘制UI
-        try:
-            font = pygame.font.Font("assets/fonts/simsunb.ttf", 32)
-        except FileNotFoundError:
-            font = pygame.font.Font(None, 32)
-        
-        # 绘制分数和时间
-        accuracy = (self.hits / self.shots_fired * 100) if self.shots_fired > 0 else 0
-        score_text = f"Score: {self.score} | Accuracy: {accuracy:.1f}%"
-        time_text = f"Time: {self.time_left}s"
-        
-        score_surface = font.render(score_text, True, (255, 255, 255))
-        time_surface = font.render(time_text, True, (255, 255, 255))
-        
-        self.screen.blit(score_surface, (20, 20))
-        self.screen.blit(time_surface, (20, 60))
-        
-        # 如果游戏结束，显示结束界面
-        if self.game_over:
-            # 显示鼠标光标，隐藏准心
-            pygame.mouse.set_visible(True)
-            
-            # 绘制半透明背景
-            overlay = pygame.Surface((self.settings.screen_width, self.settings.screen_height))
-            overlay.fill((0, 0, 0))
-            overlay.set_alpha(128)
-            self.screen.blit(overlay, (0, 0))
-            
-            # 绘制结束文本
-            game_over_text = font.render("Game Over!", True, (255, 255, 255))
-            text_rect = game_over_text.get_rect(center=(self.settings.screen_width // 2, 80))
-            self.screen.blit(game_over_text, text_rect)
-            
-            # 绘制最终分数
-            final_score = font.render(f"Final Score: {self.score}", True, (255, 255, 255))
-            score_rect = final_score.get_rect(center=(self.settings.screen_width // 2, 130))
-            self.screen.blit(final_score, score_rect)
-            
-            accuracy = (self.hits / self.shots_fired * 100) if self.shots_fired > 0 else 0
-            accuracy_text = font.render(f"Accuracy: {accuracy:.1f}%", True, (255, 255, 255))
-            accuracy_rect = accuracy_text.get_rect(center=(self.settings.screen_width // 2, 180))
-            self.screen.blit(accuracy_text, accuracy_rect)
-            
-            # 绘制历史记录图表
-            score_graph, accuracy_graph = self.score_manager.create_history_graph(self.name)
-            if score_graph and accuracy_graph:
-                # 绘制分数图表
-                graph_rect = score_graph.get_rect()
-                graph_rect.centerx = self.settings.screen_width // 2
-                graph_rect.top = 230
-                self.screen.blit(score_graph, graph_rect)
-                
-                # 绘制准确率图表
-                acc_rect = accuracy_graph.get_rect()
-                acc_rect.centerx = self.settings.screen_width // 2
-                acc_rect.top = graph_rect.bottom + 20
-                self.screen.blit(accuracy_graph, acc_rect)
-            
-            # 绘制按钮
-            self.restart_button.draw()
-            self.menu_button.draw()
-        else:
-            # 游戏进行中，绘制准心
-            self.crosshair.draw((int(self.crosshair_x), int(self.crosshair_y)))
-        
-        pygame.display.flip()
+    def _respawn_target(self, index, time_ns):
+        """重新生成单个目标的位置，time_ns 为目标出现的时间"""
+        self.target_grid.remove(index)
+        # 没有空位时留在原处，原位置一定不与其他目标重叠
+        x, y = (self.spawn_sequence.next(self.target_grid) or
+                self.target_grid.find_position(self.spawn_bounds, self.spawn_sequence.random) or
+                self.targets[index])
+        self.targets[index] = [x, y]
+        self.target_grid.insert(index, x, y)
+        self.recorder.target(time_ns, index, x, y)
     
-    def _handle_events(self):
-        """处理输入事件"""
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return False
-            if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_ESCAPE:
-                    return True
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                mouse_pos = pygame.mouse.get_pos()
-                if self.game_over:
-                    if self.restart_button.rect.collidepoint(mouse_pos):
-                        self._reset_game()
-                    elif self.menu_button.rect.collidepoint(mouse_pos):
-                        pygame.mouse.set_visible(True)  # 确保返回菜单时显示鼠标
-                        return True
-                else:
-                    self._handle_click((self.crosshair_x, self.crosshair_y))
-            if event.type == pygame.MOUSEWHEEL:
-                sens = self.sensitivity.adjust_sensitivity(event.y)
-                print(f"Sensitivity: {sens:.1f}")
-        return None
\ No newline at end of file
+    def _draw_targets(self):
+        """绘制目标小球"""
+        return [pygame.draw.circle(self.screen, self.target_color, (x, y), self.target_radius)
+                for x, y in self.targets]
\ No newline at end of file
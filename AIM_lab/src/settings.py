@@ -6,4 +6,37 @@ class Settings:
         self.bg_color = (30, 30, 30)
         
         # 游戏设置
-        self.sensitivity = 1.0  # 添加灵敏度设置 
\ No newline at end of file
+        self.sensitivity = 1.0  # 添加灵敏度设置
+        # 鼠标输入后端: "relative"(SDL相对鼠标模式，跨平台) 或 "win32"(需要pywin32)
+        self.input_backend = "relative"
+        # 目标生成序列的种子，相同种子的每局目标位置完全相同；None 表示每局随机
+        self.spawn_seed = None
+        # 固定种子的生成序列缓存目录，设为None则不缓存
+        self.spawn_cache_dir = "data/spawn_cache"
+        # 每局游戏的录像保存目录，设为None则不录像
+        self.replay_dir = "data/replays"
+        
+        # 历史图表磁盘缓存目录(只用于matplotlib后端)，设为None则只缓存在内存中
+        self.graph_cache_dir = "data/graph_cache"
+        # 历史图表后端: "pygame" 或 "matplotlib"
+        self.graph_backend = "pygame"
+        # matplotlib图表的绘图进程数，0 表示在主线程中同步绘制
+        self.graph_workers = 2
+        
+        # 分数存储后端: "json" 或 "sqlite"
+        self.score_backend = "json"
+        # 保存成绩时每几次写入fsync一次，1 表示每次都同步；程序退出时总会同步。
+        # SQLite后端每条记录都单独提交，大于1时只在WAL检查点fsync
+        self.score_fsync_batch = 1
+        # 原始成绩记录保留的天数，之后按天汇总(None 表示永久保留)；
+        # 超过 score_daily_days 天的按天汇总再合并为按周汇总。
+        # 汇总后原始记录会从存储中删除且无法恢复，所以默认不开启，例如设为 90 开启
+        self.score_raw_days = None
+        self.score_daily_days = 365
+        
+        # 游戏模式使用脏矩形渲染，只刷新变化的区域(适合软件渲染)
+        self.dirty_rects = False
+        
+        # 游戏主循环: 逻辑更新频率和渲染帧率上限(0 表示不限制，可设为144/240)
+        self.sim_rate = 240
+        self.max_fps = 60
\ No newline at end of file
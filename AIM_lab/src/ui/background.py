@@ -0,0 +1,65 @@
+import pygame
+
+class Background:
+    """预先绘制好的静态背景层: 底色、网格和参考线
+    
+    背景只在分辨率或配色改变时重新绘制，每帧只需要一次blit。
+    """
+    def __init__(self, bg_color, grid_size, grid_color, guide_lines=()):
+        self.bg_color = bg_color
+        self.grid_size = grid_size
+        self.grid_color = grid_color
+        # 水平参考线: [(y, 颜色, 线宽)]
+        self.guide_lines = list(guide_lines)
+        
+        self.surface = None
+        self._key = None
+    
+    def set_theme(self, bg_color=None, grid_color=None, grid_size=None, guide_lines=None):
+        """修改配色，下一次绘制时重建背景"""
+        if bg_color is not None:
+            self.bg_color = bg_color
+        if grid_color is not None:
+            self.grid_color = grid_color
+        if grid_size is not None:
+            self.grid_size = grid_size
+        if guide_lines is not None:
+            self.guide_lines = list(guide_lines)
+    
+    def get(self, size):
+        """获取指定尺寸的背景，必要时重建"""
+        key = (tuple(size), self.bg_color, self.grid_size, self.grid_color,
+               tuple(self.guide_lines))
+        if key != self._key:
+            self.surface = self._build(size)
+            self._key = key
+        return self.surface
+    
+    def draw(self, screen):
+        """把背景绘制到屏幕上"""
+        screen.blit(self.get(screen.get_size()), (0, 0))
+    
+    def restore(self, screen, rect):
+        """只恢复屏幕上的一块区域"""
+        screen.blit(self.get(screen.get_size()), rect, rect)
+    
+    def _build(self, size):
+        """绘制背景"""
+        width, height = size
+        surface = pygame.Surface((width, height))
+        if pygame.display.get_surface() is not None:
+            # 转换成与屏幕相同的像素格式，blit更快
+            surface = surface.convert()
+        surface.fill(self.bg_color)
+        
+        # 绘制网格
+        for x in range(0, width, self.grid_size):
+            pygame.draw.line(surface, self.grid_color, (x, 0), (x, height))
+        for y in range(0, height, self.grid_size):
+            pygame.draw.line(surface, self.grid_color, (0, y), (width, y))
+        
+        # 绘制参考线
+        for y, color, line_width in self.guide_lines:
+            pygame.draw.line(surface, color, (0, y), (width, y), line_width)
+        
+        return surface
@@ -1,4 +1,5 @@
 import pygame
+from src.utils.assets import render_text
 
 class Button:
     def __init__(self, screen, msg, x, y, width, height):
@@ -11,12 +12,11 @@ class Button:
         
         # 按钮文本设置
         self.msg = msg
-        self.font = pygame.font.Font(None, 48)
         self.text_color = (255, 255, 255)
         self.button_color = (0, 135, 255)
         
-        # 渲染按钮文本
-        self.msg_image = self.font.render(msg, True, self.text_color)
+        # 渲染按钮文本，与其他界面共用文字缓存
+        self.msg_image = render_text(msg, 48, self.text_color, path=None)
         self.msg_image_rect = self.msg_image.get_rect()
         self.msg_image_rect.center = self.rect.center
     
@@ -14,12 +14,14 @@ class Crosshair:
         x, y = int(pos[0]), int(pos[1])  # 确保坐标是整数
         
         # 绘制十字准心
-        pygame.draw.line(self.screen, self.color, 
+        horizontal = pygame.draw.line(self.screen, self.color, 
                         (x - self.size, y), 
                         (x + self.size, y), self.thickness)
-        pygame.draw.line(self.screen, self.color, 
+        vertical = pygame.draw.line(self.screen, self.color, 
                         (x, y - self.size), 
                         (x, y + self.size), self.thickness)
+        # 返回绘制的区域，供脏矩形渲染使用
+        return horizontal.union(vertical)
     
     def show(self):
         """显示鼠标光标"""
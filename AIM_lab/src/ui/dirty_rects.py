@@ -0,0 +1,37 @@
+import pygame
+
+class DirtyRectRenderer:
+    """脏矩形渲染
+    
+    每帧只用背景层恢复上一帧绘制过的区域，再用 display.update(rects)
+    只提交这一帧和上一帧变化的区域，适合软件渲染的SDL。
+    """
+    def __init__(self, screen, background):
+        self.screen = screen
+        self.background = background
+        # 上一帧绘制过的区域
+        self.prev_rects = []
+        # 下一帧需要整屏重绘，例如第一帧或从结束界面返回
+        self.full_redraw = True
+    
+    def invalidate(self):
+        """下一帧整屏重绘"""
+        self.full_redraw = True
+    
+    def begin(self):
+        """开始一帧: 擦除上一帧绘制的内容"""
+        if self.full_redraw:
+            self.background.draw(self.screen)
+        else:
+            for rect in self.prev_rects:
+                self.background.restore(self.screen, rect)
+    
+    def present(self, rects):
+        """提交这一帧，rects 为这一帧绘制过的区域"""
+        rects = [rect for rect in rects if rect]
+        if self.full_redraw:
+            pygame.display.flip()
+            self.full_redraw = False
+        else:
+            pygame.display.update(self.prev_rects + rects)
+        self.prev_rects = rects
@@ -1,5 +1,7 @@
 import pygame
 from src.ui.button import Button
+from src.utils.assets import render_text
+from src.utils.events import wait_events
 
 class SettingsMenu:
     def __init__(self, screen, settings):
@@ -29,9 +31,12 @@ class SettingsMenu:
     def run(self):
         running = True
         dragging = False
+        self._draw()
         
         while running:
-            for event in pygame.event.get():
+            # 没有输入时阻塞等待；拖动滑块产生的事件会立即唤醒，不增加延迟
+            redraw = False
+            for event in wait_events(500):
                 if event.type == pygame.QUIT:
                     return False
                 if event.type == pygame.KEYDOWN:
@@ -49,7 +54,11 @@ class SettingsMenu:
                 if event.type == pygame.MOUSEBUTTONUP:
                     dragging = False
                 
+                if event.type != pygame.MOUSEMOTION:
+                    redraw = True
+                
                 if event.type == pygame.MOUSEMOTION and dragging:
+                    redraw = True
                     mouse_x = pygame.mouse.get_pos()[0]
                     # 限制滑块在滑动条范围内
                     x = max(self.slider_rect.left, min(mouse_x, self.slider_rect.right))
@@ -57,7 +66,8 @@ class SettingsMenu:
                     # 计算灵敏度值 (0.1 到 2.0)
                     self.sensitivity = 0.1 + (x - self.slider_rect.left) / self.slider_rect.width * 1.9
             
-            self._draw()
+            if redraw:
+                self._draw()
         
         return True
     
@@ -65,20 +75,12 @@ class SettingsMenu:
         self.screen.fill(self.settings.bg_color)
         
         # 绘制标题
-        try:
-            font = pygame.font.Font("assets/fonts/simsunb.ttf", 48)
-            small_font = pygame.font.Font("assets/fonts/simsunb.ttf", 24)
-        except FileNotFoundError:
-            font = pygame.font.Font(None, 48)
-            small_font = pygame.font.Font(None, 24)
-        
-        # 绘制标题
-        title = font.render("Settings", True, (255, 255, 255))
+        title = render_text("Settings", 48, (255, 255, 255))
         title_rect = title.get_rect(center=(self.settings.screen_width // 2, 100))
         self.screen.blit(title, title_rect)
         
         # 绘制灵敏度值
-        sens_text = small_font.render(f"Sensitivity: {self.sensitivity:.2f}", True, (255, 255, 255))
+        sens_text = render_text(f"Sensitivity: {self.sensitivity:.2f}", 24, (255, 255, 255))
         self.screen.blit(sens_text, (300, 150))
         
         # 绘制滑动条
@@ -0,0 +1,168 @@
+"""基于录像的瞄准轨迹分析
+
+对每一次击中计算:
+    ttk_ms        目标出现到被击中的时间
+    peak_velocity 这次甩枪的最大速度(像素/秒)
+    overshoot     沿目标方向越过目标的距离(像素)
+    corrections   沿目标方向来回修正的次数
+    throughput    Fitts 定律吞吐量 log2(D/W + 1) / MT (比特/秒)
+甩枪的起点为目标出现或上一次点击中较晚的一个。
+录像通过内存映射直接读成NumPy数组，所有计算都是向量化的，没有逐个采样的Python循环。
+"""
+import numpy as np
+from src.utils.replay import HEADER, RECORD, TARGET, SHOT, ReplayReader, list_replays
+
+# 与 replay.RECORD 的布局一致
+RECORD_DTYPE = np.dtype([
+    ("dt_us", "<u4"), ("a", "<i2"), ("b", "<i2"), ("kind", "u1"), ("arg", "u1"),
+])
+assert RECORD_DTYPE.itemsize == RECORD.size
+
+METRICS = ("ttk_ms", "peak_velocity", "overshoot", "corrections", "throughput")
+
+def load_session(path):
+    """把一局录像读成数组: 时间(纳秒)、类型、参数、准心坐标、目标坐标、目标半径"""
+    with ReplayReader(path) as reader:
+        view = np.frombuffer(reader.data, dtype=RECORD_DTYPE, count=len(reader), offset=HEADER.size)
+        # 复制后释放对映射内存的引用，否则无法关闭文件
+        records = view.copy()
+        del view
+        radius = reader.target_radius
+    kind = records["kind"]
+    motion = kind != TARGET
+    return {
+        "t": np.cumsum(records["dt_us"], dtype=np.int64) * 1000,
+        "kind": kind,
+        "arg": records["arg"],
+        # 准心坐标只对非 TARGET 记录有意义
+        "x": np.cumsum(np.where(motion, records["a"], 0), dtype=np.int64),
+        "y": np.cumsum(np.where(motion, records["b"], 0), dtype=np.int64),
+        "a": records["a"].astype(np.int64),
+        "b": records["b"].astype(np.int64),
+        "radius": radius,
+    }
+
+def _empty_metrics():
+    return {name: np.empty(0) for name in METRICS}
+
+def shot_metrics(session):
+    """计算一局中每次击中的指标，返回 {指标名: 数组}"""
+    t, kind, arg = session["t"], session["kind"], session["arg"]
+    n = len(kind)
+    shots = np.flatnonzero(kind == SHOT)
+    hits = shots[arg[shots] == 1]
+    # 击中后模式会立即重新生成被击中的目标，紧跟的 TARGET 记录给出目标编号
+    hits = hits[hits + 1 < n]
+    hits = hits[kind[hits + 1] == TARGET]
+    if len(hits) == 0:
+        return _empty_metrics()
+    
+    # 每条 TARGET 记录之前同一编号的 TARGET 记录，即被击中的目标出现的位置
+    targets = np.flatnonzero(kind == TARGET)
+    order = np.lexsort((targets, arg[targets]))
+    sorted_targets = targets[order]
+    same = np.r_[False, arg[sorted_targets[1:]] == arg[sorted_targets[:-1]]]
+    previous = np.full(n, -1, dtype=np.int64)
+    previous[sorted_targets[same]] = sorted_targets[np.flatnonzero(same) - 1]
+    spawn = previous[hits + 1]
+    valid = spawn >= 0
+    hits, spawn = hits[valid], spawn[valid]
+    if len(hits) == 0:
+        return _empty_metrics()
+    
+    # 甩枪起点: 目标出现和上一次点击中较晚的一个
+    shot_pos = np.searchsorted(shots, hits)
+    previous_shot = np.where(shot_pos > 0, shots[np.maximum(shot_pos - 1, 0)], -1)
+    start = np.maximum(spawn, previous_shot)
+    
+    # 每段轨迹在准心采样中的范围 [lo, hi)，lo 为起点时刻的准心位置
+    motion = np.flatnonzero(kind != TARGET)
+    lo = np.maximum(np.searchsorted(motion, start, side="right") - 1, 0)
+    hi = np.searchsorted(motion, hits, side="right")
+    lengths = hi - lo
+    
+    # 把所有段的采样拼成一个数组，segment 为每个采样所属的段
+    count = len(hits)
+    segment = np.repeat(np.arange(count), lengths)
+    offsets = np.cumsum(lengths) - lengths
+    samples = motion[np.repeat(lo, lengths) + np.arange(lengths.sum()) - np.repeat(offsets, lengths)]
+    sx, sy, st = session["x"][samples], session["y"][samples], session["t"][samples]
+    
+    # 甩枪方向和距离
+    x0, y0 = session["x"][motion[lo]], session["y"][motion[lo]]
+    tx, ty = session["a"][spawn], session["b"][spawn]
+    distance = np.hypot(tx - x0, ty - y0)
+    safe = np.where(distance > 0, distance, 1)
+    ux, uy = (tx - x0) / safe, (ty - y0) / safe
+    projection = (sx - x0[segment]) * ux[segment] + (sy - y0[segment]) * uy[segment]
+    
+    # 相邻采样只在同一段内才计算速度
+    same_segment = segment[1:] == segment[:-1]
+    dt = np.diff(st) / 1e9
+    moving = same_segment & (dt > 0)
+    speed = np.hypot(np.diff(sx), np.diff(sy))[moving] / dt[moving]
+    peak_velocity = np.zeros(count)
+    np.maximum.at(peak_velocity, segment[1:][moving], speed)
+    
+    furthest = np.full(count, -np.inf)
+    np.maximum.at(furthest, segment, projection)
+    overshoot = np.maximum(furthest - distance, 0)
+    
+    # 沿目标方向的速度改变符号的次数
+    step = np.diff(projection)
+    keep = same_segment & (step != 0)
+    direction = np.sign(step[keep])
+    owner = segment[1:][keep]
+    reversal = (direction[1:] != direction[:-1]) & (owner[1:] == owner[:-1])
+    corrections = np.bincount(owner[1:][reversal], minlength=count)
+    
+    width = 2 * session["radius"] if session["radius"] else 1
+    movement_time = (t[hits] - t[start]) / 1e9
+    index_of_difficulty = np.log2(distance / width + 1)
+    throughput = np.where(movement_time > 0,
+                          index_of_difficulty / np.where(movement_time > 0, movement_time, 1), 0)
+    
+    return {
+        "ttk_ms": (t[hits] - t[spawn]) / 1e6,
+        "peak_velocity": peak_velocity,
+        "overshoot": overshoot,
+        "corrections": corrections.astype(float),
+        "throughput": throughput,
+    }
+
+def history_metrics(paths):
+    """批量计算多局录像，返回拼接后的每次击中指标和每局的击中数
+    空的、不完整的或版本不匹配的录像跳过，不影响其他录像
+    """
+    per_session = []
+    for path in paths:
+        try:
+            per_session.append(shot_metrics(load_session(path)))
+        except (ValueError, OSError) as e:
+            print(f"Error loading replay {path}: {e}")
+    merged = {
+        name: np.concatenate([m[name] for m in per_session]) if per_session else np.empty(0)
+        for name in METRICS
+    }
+    merged["session_hits"] = np.array([len(m["ttk_ms"]) for m in per_session], dtype=np.int64)
+    return merged
+
+def summarize(metrics):
+    """每个指标的平均值和中位数"""
+    summary = {"hits": int(len(metrics["ttk_ms"]))}
+    for name in METRICS:
+        values = metrics[name]
+        summary[name] = float(values.mean()) if len(values) else 0.0
+        summary[f"{name}_median"] = float(np.median(values)) if len(values) else 0.0
+    return summary
+
+def analyze_mode(mode, replay_dir="data/replays", limit=None):
+    """一个模式最近 limit 局录像的瞄准指标汇总"""
+    paths = list_replays(replay_dir, mode)
+    if limit:
+        paths = paths[-limit:]
+    metrics = history_metrics(paths)
+    summary = summarize(metrics)
+    # 只计入能读取的录像
+    summary["sessions"] = len(metrics["session_hits"])
+    return summary
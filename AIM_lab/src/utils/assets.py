@@ -0,0 +1,54 @@
+import pygame
+from collections import OrderedDict
+
+# 默认字体
+DEFAULT_FONT = "assets/fonts/simsunb.ttf"
+
+# 已加载的字体: (路径, 字号) -> Font
+_fonts = {}
+# 找不到的字体文件，只警告一次
+_missing_fonts = set()
+
+# 渲染好的文字: (文本, 字号, 颜色, 抗锯齿, 路径) -> Surface，按LRU淘汰
+_text_cache = OrderedDict()
+TEXT_CACHE_SIZE = 256
+
+def get_font(size, path=DEFAULT_FONT):
+    """获取字体，每个 (路径, 字号) 只加载一次
+    path 为None或文件不存在时使用pygame默认字体
+    """
+    key = (path, size)
+    font = _fonts.get(key)
+    if font is None:
+        if path is not None and path not in _missing_fonts:
+            try:
+                font = pygame.font.Font(path, size)
+            except FileNotFoundError:
+                print(f"警告：找不到字体文件 {path}")
+                _missing_fonts.add(path)
+        if font is None:
+            font = pygame.font.Font(None, size)
+        _fonts[key] = font
+    return font
+
+def render_text(text, size, color, antialias=True, path=DEFAULT_FONT):
+    """渲染文字并缓存结果
+    返回的Surface是共享的，调用方不要修改它
+    """
+    key = (text, size, tuple(color), antialias, path)
+    surface = _text_cache.get(key)
+    if surface is not None:
+        _text_cache.move_to_end(key)
+        return surface
+    
+    surface = get_font(size, path).render(text, antialias, color)
+    _text_cache[key] = surface
+    if len(_text_cache) > TEXT_CACHE_SIZE:
+        _text_cache.popitem(last=False)
+    return surface
+
+def clear_cache():
+    """清空字体和文字缓存"""
+    _fonts.clear()
+    _missing_fonts.clear()
+    _text_cache.clear()
@@ -0,0 +1,86 @@
+import pygame
+from src.utils.assets import render_text
+
+# 图表配色，与matplotlib的dark_background风格保持一致
+AXIS_COLOR = (200, 200, 200)
+GRID_COLOR = (255, 255, 255, 70)
+TEXT_COLOR = (255, 255, 255)
+
+def _format_tick(value):
+    """格式化坐标轴刻度"""
+    if abs(value) >= 10000:
+        return f"{value / 1000:.0f}k"
+    if abs(value) >= 100:
+        return f"{value:.0f}"
+    return f"{value:.1f}"
+
+def show_markers(count, width):
+    """数据点之间平均至少有8个像素时才画出数据点"""
+    return count * 8 <= width
+
+def draw_line_chart(values, width, height, color, title, grid_lines=4, x=None):
+    """直接在pygame Surface上绘制折线图
+    values: 数据序列
+    color: 折线颜色
+    x: 每个点的横坐标(下采样后在原序列中的下标)，默认为 0, 1, 2, ...
+    """
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    # 绘图区域，留出标题和刻度的位置
+    title_surface = render_text(title, 20, TEXT_COLOR, path=None)
+    plot = pygame.Rect(44, title_surface.get_height() + 10, 0, 0)
+    plot.width = width - plot.left - 12
+    plot.height = height - plot.top - 16
+
+    # 绘制标题
+    surface.blit(title_surface, title_surface.get_rect(centerx=width // 2, top=4))
+
+    low = min(values)
+    high = max(values)
+    if high == low:
+        # 所有值相同时上下各留一点空间
+        low -= 1
+        high += 1
+    span = high - low
+
+    # 绘制网格和纵轴刻度
+    for i in range(grid_lines + 1):
+        y = plot.bottom - round(i * plot.height / grid_lines)
+        pygame.draw.line(surface, GRID_COLOR, (plot.left, y), (plot.right, y))
+        label = render_text(_format_tick(low + span * i / grid_lines), 20, TEXT_COLOR, path=None)
+        surface.blit(label, label.get_rect(right=plot.left - 4, centery=y))
+
+    # 绘制坐标轴
+    pygame.draw.line(surface, AXIS_COLOR, plot.bottomleft, plot.bottomright)
+    pygame.draw.line(surface, AXIS_COLOR, plot.bottomleft, plot.topleft)
+
+    # 计算数据点位置
+    count = len(values)
+    if x is None:
+        x = range(count)
+    first = x[0]
+    x_span = x[-1] - first
+    step = plot.width / x_span if x_span else 0
+    points = [
+        (plot.left + round((i - first) * step) if x_span else plot.centerx,
+         plot.bottom - round((value - low) / span * plot.height))
+        for i, value in zip(x, values)
+    ]
+
+    # 绘制折线，点太密时不画数据点
+    if len(points) > 1:
+        pygame.draw.lines(surface, color, False, points, 2)
+    if show_markers(count, width):
+        for point in points:
+            pygame.draw.circle(surface, color, point, 3)
+
+    return surface
+
+def draw_placeholder(width, height, title, text="Loading..."):
+    """图表还没画好时显示的占位图"""
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    pygame.draw.rect(surface, GRID_COLOR, surface.get_rect(), 1)
+    title_surface = render_text(title, 20, TEXT_COLOR, path=None)
+    surface.blit(title_surface, title_surface.get_rect(centerx=width // 2, top=4))
+    label = render_text(text, 20, AXIS_COLOR, path=None)
+    surface.blit(label, label.get_rect(center=(width // 2, height // 2)))
+    return surface
@@ -0,0 +1,50 @@
+import time
+
+NS_PER_MS = 1_000_000
+
+class RealClock:
+    """真实时间，游戏中默认使用"""
+    simulated = False
+    
+    def now_ns(self):
+        return time.perf_counter_ns()
+    
+    def now_ms(self):
+        return self.now_ns() // NS_PER_MS
+    
+    def sleep_until(self, deadline_ns):
+        """等待到指定时间: 先粗略sleep，最后1毫秒忙等以保证精度"""
+        while True:
+            remaining = deadline_ns - time.perf_counter_ns()
+            if remaining <= 0:
+                return
+            if remaining > 1_500_000:
+                time.sleep((remaining - NS_PER_MS) / 1_000_000_000)
+
+class SimulatedClock:
+    """模拟时间，只有调用 advance 或 sleep_until 时才会前进
+    
+    用于测试、基准测试和机器人模拟。每个逻辑步长仍然会渲染一帧，一局60秒的游戏
+    需要几秒；主循环使用 headless 不渲染时只需要几百毫秒。
+    """
+    simulated = True
+    
+    def __init__(self, start_ns=0):
+        self.time_ns = start_ns
+    
+    def now_ns(self):
+        return self.time_ns
+    
+    def now_ms(self):
+        return self.time_ns // NS_PER_MS
+    
+    def advance(self, ns):
+        self.time_ns += ns
+    
+    def advance_ms(self, ms):
+        self.advance(ms * NS_PER_MS)
+    
+    def sleep_until(self, deadline_ns):
+        """直接跳到指定时间，不真正等待"""
+        if deadline_ns > self.time_ns:
+            self.time_ns = deadline_ns
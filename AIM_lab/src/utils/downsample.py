@@ -0,0 +1,74 @@
+"""折线图的下采样
+
+历史记录很多时，图表只需要画出与像素宽度相当的点数。两种方法都返回
+保留下来的点在原序列中的下标，原始数据不变:
+    lttb    Largest-Triangle-Three-Buckets，保留视觉上最显著的点(高峰和低谷)
+    minmax  每个桶保留最小值和最大值，不会漏掉任何极值
+"""
+import numpy as np
+
+METHODS = ("lttb", "minmax")
+
+def lttb(values, threshold):
+    """从 values 中选出 threshold 个点的下标
+    首尾两点总是保留，中间的点分成 threshold-2 个桶，每个桶选出与上一个选中点
+    和下一个桶平均点组成的三角形面积最大的点
+    """
+    y = np.asarray(values, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    # 桶的边界，第 i 个桶为 [edges[i], edges[i+1])
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    # 用前缀和一次算出所有桶的平均点，最后一个桶之后是最后一个点
+    prefix = np.concatenate(([0.0], np.cumsum(y)))
+    average_y = np.append((prefix[edges[1:]] - prefix[edges[:-1]]) / sizes, y[-1])
+    average_x = np.append((edges[1:] + edges[:-1] - 1) / 2, n - 1)
+    
+    # 把桶排成二维数组，每行一个桶，不足的位置重复桶内第一个点
+    columns = np.arange(sizes.max())
+    bucket_x = np.where(columns < sizes[:, None], edges[:-1, None] + columns, edges[:-1, None])
+    bucket_y = y[bucket_x]
+    
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    a = 0
+    # 每个桶依赖上一个桶选出的点，只能逐桶计算，桶内是向量化的
+    for i in range(threshold - 2):
+        cx, cy = average_x[i + 1], average_y[i + 1]
+        area = np.abs((a - cx) * (bucket_y[i] - y[a]) - (a - bucket_x[i]) * (cy - y[a]))
+        a = bucket_x[i, area.argmax()]
+        selected[i + 1] = a
+    return selected
+
+def minmax(values, buckets):
+    """把 values 分成 buckets 个桶，返回每个桶最小值和最大值的下标(按顺序，包含首尾)"""
+    y = np.asarray(values, dtype=float)
+    n = len(y)
+    if buckets < 1 or 2 * buckets >= n:
+        return np.arange(n)
+    
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    bucket = np.repeat(np.arange(buckets), np.diff(edges))
+    # 按 (桶, 值) 排序后，每个桶的第一个和最后一个就是最小值和最大值
+    order = np.lexsort((y, bucket))
+    lowest = order[edges[:-1]]
+    highest = order[edges[1:] - 1]
+    return np.unique(np.concatenate(([0, n - 1], lowest, highest)))
+
+def downsample(values, max_points, method="lttb"):
+    """返回 (下标列表, 值列表)，点数不超过 max_points；method 为None时不下采样"""
+    if method is None or len(values) <= max_points:
+        return list(range(len(values))), list(values)
+    if method == "lttb":
+        index = lttb(values, max_points)
+    elif method == "minmax":
+        # 每个桶保留两个点，另外保留首尾两点
+        index = minmax(values, (max_points - 2) // 2)
+    else:
+        raise ValueError(f"未知的下采样方法: {method}")
+    y = np.asarray(values)
+    return index.tolist(), y[index].tolist()
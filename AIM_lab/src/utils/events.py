@@ -0,0 +1,15 @@
+import pygame
+
+def wait_events(timeout=0):
+    """阻塞等待事件，返回等到的所有事件
+    timeout: 最长等待的毫秒数，超时返回空列表；0 表示一直等待
+    """
+    event = pygame.event.wait(timeout) if timeout else pygame.event.wait()
+    if event.type == pygame.NOEVENT:
+        return []
+    # 一次取出队列中剩余的事件，处理完再重绘
+    return [event] + pygame.event.get()
+
+def needs_redraw(events):
+    """判断这些事件是否可能改变界面，鼠标移动不会改变菜单内容"""
+    return any(event.type != pygame.MOUSEMOTION for event in events)
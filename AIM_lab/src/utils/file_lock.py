@@ -0,0 +1,60 @@
+import os
+import threading
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+class FileLock:
+    """跨进程的互斥锁，多个游戏实例共用一个 data 目录时保护同一组文件
+    
+    Windows 上锁住锁文件的第一个字节(msvcrt)，其他系统使用 flock。
+    同一进程中的多个线程先经过线程锁，文件锁只被一个线程持有。
+    不可重入。
+    """
+    def __init__(self, path):
+        self.path = path
+        self.thread_lock = threading.Lock()
+        self.file = None
+    
+    def acquire(self):
+        self.thread_lock.acquire()
+        try:
+            self.file = open(self.path, "a+b")
+            if os.name == "nt":
+                self.file.seek(0)
+                while True:
+                    try:
+                        # LK_LOCK 重试10次后失败，继续等待
+                        msvcrt.locking(self.file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        pass
+            else:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_EX)
+        except BaseException:
+            if self.file:
+                self.file.close()
+                self.file = None
+            self.thread_lock.release()
+            raise
+    
+    def release(self):
+        try:
+            if os.name == "nt":
+                self.file.seek(0)
+                msvcrt.locking(self.file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(self.file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self.file.close()
+            self.file = None
+            self.thread_lock.release()
+    
+    def __enter__(self):
+        self.acquire()
+        return self
+    
+    def __exit__(self, *exc):
+        self.release()
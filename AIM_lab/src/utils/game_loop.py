@@ -0,0 +1,87 @@
+from src.utils.clock import RealClock
+from src.utils.profiler import get_profiler
+
+NS_PER_SECOND = 1_000_000_000
+
+class GameLoop:
+    """所有游戏模式共用的主循环
+    
+    游戏逻辑以固定步长更新(sim_rate 次/秒)，渲染帧率由 max_fps 决定，
+    0 表示不限制。渲染时传入插值系数 alpha，表示当前时刻位于上一次
+    和下一次逻辑更新之间的位置。计时来自 clock，默认为真实时间
+    (time.perf_counter_ns)；使用模拟时间时循环不会真正等待。
+    传入 sampler 时，两帧之间的等待交给它，以便持续采样输入。
+    headless 为True时不调用 draw，只运行输入和逻辑，用于在模拟时间下快速跑完一局。
+    """
+    def __init__(self, sim_rate=240, max_fps=60, sampler=None, clock=None, headless=False):
+        self.step_ns = NS_PER_SECOND // sim_rate
+        self.frame_ns = NS_PER_SECOND // max_fps if max_fps else 0
+        # 卡顿后最多追赶的时间，避免越追越慢
+        self.max_catch_up_ns = NS_PER_SECOND // 4
+        self.sampler = sampler
+        self.clock = clock or RealClock()
+        self.headless = headless
+        self.profiler = get_profiler()
+        
+        # 最近一帧的耗时，供调试显示
+        self.last_frame_ns = 0
+        self.frames = 0
+    
+    def set_max_fps(self, max_fps):
+        """修改渲染帧率上限，0 表示不限制"""
+        self.frame_ns = NS_PER_SECOND // max_fps if max_fps else 0
+    
+    def run(self, handle_events, update, draw, max_frames=None):
+        """运行主循环
+        handle_events(): 返回None继续运行，否则结束循环并返回该值
+        update(dt): 以固定步长调用，dt为秒
+        draw(alpha): 每帧调用一次，alpha 为 [0, 1) 的插值系数
+        max_frames: 运行指定帧数后返回True，用于测试
+        """
+        dt = self.step_ns / NS_PER_SECOND
+        accumulator = 0
+        previous = self.clock.now_ns()
+        self.frames = 0
+        profiler = self.profiler
+        # 模拟时间不限帧率时，每帧前进一个逻辑步长
+        frame_ns = self.frame_ns or (self.step_ns if self.clock.simulated else 0)
+        
+        while True:
+            profiler.begin_frame()
+            frame_start = self.clock.now_ns()
+            elapsed = frame_start - previous
+            previous = frame_start
+            self.last_frame_ns = elapsed
+            accumulator += min(elapsed, self.max_catch_up_ns)
+            
+            profiler.begin("events")
+            result = handle_events()
+            profiler.end("events")
+            if result is not None:
+                return result
+            
+            profiler.begin("update")
+            while accumulator >= self.step_ns:
+                update(dt)
+                accumulator -= self.step_ns
+            profiler.end("update")
+            
+            if not self.headless:
+                profiler.begin("draw")
+                draw(accumulator / self.step_ns)
+                profiler.end("draw")
+            profiler.end_frame()
+            
+            self.frames += 1
+            if max_frames is not None and self.frames >= max_frames:
+                return True
+            
+            if frame_ns:
+                self._wait_until(frame_start + frame_ns)
+    
+    def _wait_until(self, deadline):
+        """等待到下一帧开始，有采样器时在等待期间继续采样输入"""
+        if self.sampler:
+            self.sampler.wait_until(deadline)
+        else:
+            self.clock.sleep_until(deadline)
\ No newline at end of file
@@ -0,0 +1,97 @@
+"""在子进程中用matplotlib绘制历史图表
+
+matplotlib 绘图时一直持有GIL，放在主进程的线程里仍然会卡住主循环，
+所以交给进程池。子进程直接返回RGBA像素，主进程用 pygame.image.frombuffer
+生成Surface，不需要PNG编码和解码。
+本模块顶层不导入pygame和matplotlib，子进程只导入绘图需要的部分。
+"""
+
+# 与原来 plt.plot 的配色一致
+SCORE_COLOR = "#00ff00"
+ACCURACY_COLOR = "#ff9900"
+
+def render_chart_rgba(series, width, height, color, title):
+    """绘制一张折线图，series 为 (横坐标, 值)，返回 (RGBA字节, (宽, 高))"""
+    import matplotlib.style
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    
+    # 不经过pyplot，每张图都是独立的Figure，不依赖全局状态
+    with matplotlib.style.context("dark_background"):
+        figure = Figure(figsize=(width / 100, height / 100), dpi=100)
+        canvas = FigureCanvasAgg(figure)
+        axes = figure.add_subplot()
+        x, values = series
+        # 点太密时不画数据点
+        marker = "o" if len(values) * 8 <= width else None
+        axes.plot(x, values, color=color, marker=marker)
+        axes.set_title(title)
+        axes.grid(True, alpha=0.3)
+        # 透明背景，与 savefig(transparent=True) 相同
+        figure.patch.set_alpha(0)
+        axes.patch.set_alpha(0)
+        canvas.draw()
+    return bytes(canvas.buffer_rgba()), canvas.get_width_height()
+
+def render_history_rgba(scores, accuracies, width, height):
+    """绘制分数图和准确率图，scores/accuracies 为下采样后的 (横坐标, 值)"""
+    return (render_chart_rgba(scores, width, height, SCORE_COLOR, "Score History"),
+            render_chart_rgba(accuracies, width, height, ACCURACY_COLOR, "Accuracy History"))
+
+def to_surfaces(charts):
+    """把子进程返回的RGBA像素转换为Surface"""
+    import pygame
+    return tuple(pygame.image.frombuffer(data, size, "RGBA") for data, size in charts)
+
+_executor = None
+
+def get_executor(max_workers=2):
+    """进程共用的绘图进程池，第一次使用时才创建
+    使用 spawn 方式启动子进程，避免复制主进程中已经初始化的pygame窗口
+    """
+    global _executor
+    if _executor is None:
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        _executor = ProcessPoolExecutor(
+            max_workers, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+class GraphRenderer:
+    """记录一个 ScoreManager 提交到进程池、还没有取走的图表"""
+    def __init__(self, max_workers=2):
+        self.max_workers = max_workers
+        # 图表的键 -> Future
+        self.pending = {}
+    
+    def submit(self, key, scores, accuracies, width, height):
+        """开始在后台绘制，同一个键只提交一次"""
+        if key in self.pending:
+            return
+        self.pending[key] = get_executor(self.max_workers).submit(
+            render_history_rgba, scores, accuracies, width, height
+        )
+    
+    def is_pending(self, key):
+        return key in self.pending
+    
+    def collect(self):
+        """取走所有已经画好的图表，返回 [(键, (分数图, 准确率图))]，绘制失败的为 (None, None)"""
+        done = [key for key, future in self.pending.items() if future.done()]
+        results = []
+        for key in done:
+            future = self.pending.pop(key)
+            try:
+                graphs = to_surfaces(future.result())
+            except Exception as e:
+                print(f"Error rendering graph: {e}")
+                graphs = (None, None)
+            results.append((key, graphs))
+        return results
+    
+    def discard(self, mode_name=None):
+        """丢弃某个模式(None表示全部)正在绘制的图表，结果已经过期"""
+        for key in list(self.pending):
+            if mode_name is None or key[0] == mode_name:
+                self.pending.pop(key).cancel()
@@ -0,0 +1,90 @@
+import pygame
+
+class RelativeMouseBackend:
+    """基于SDL相对鼠标模式的输入后端，跨平台
+    
+    隐藏光标并锁定输入后SDL进入相对模式，鼠标不会碰到屏幕边缘；
+    结束界面重新显示光标时自动退出相对模式。
+    每个 MOUSEMOTION 事件的 rel 都会被累加，不会丢失两帧之间的移动。
+    """
+    def __init__(self):
+        self.dx = 0
+        self.dy = 0
+    
+    def start(self, center):
+        pygame.event.set_grab(True)
+        pygame.mouse.set_visible(False)
+        # 丢弃进入相对模式之前的移动
+        pygame.mouse.get_rel()
+    
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEMOTION:
+            self.dx += event.rel[0]
+            self.dy += event.rel[1]
+    
+    def poll(self):
+        """返回自上次调用以来累计的移动量"""
+        dx, dy = self.dx, self.dy
+        self.dx = self.dy = 0
+        return dx, dy
+    
+    def stop(self):
+        pygame.event.set_grab(False)
+        pygame.mouse.set_visible(True)
+
+class Win32CursorBackend:
+    """旧的Windows后端: 每帧读取光标位置并把光标移回窗口中心
+    
+    需要安装pywin32，只在选择该后端时才导入。
+    """
+    def __init__(self):
+        import win32api
+        self.win32api = win32api
+        self.center = (0, 0)
+        self.last_mouse_pos = (0, 0)
+    
+    def start(self, center):
+        window = pygame.display.get_surface()
+        window_pos = window.get_abs_offset()
+        self.center = center
+        self.win32api.SetCursorPos((window_pos[0] + center[0], window_pos[1] + center[1]))
+        pygame.event.set_grab(True)
+        pygame.mouse.set_visible(False)
+        self.last_mouse_pos = pygame.mouse.get_pos()
+    
+    def handle_event(self, event):
+        pass
+    
+    def poll(self):
+        current_mouse_pos = pygame.mouse.get_pos()
+        dx = current_mouse_pos[0] - self.last_mouse_pos[0]
+        dy = current_mouse_pos[1] - self.last_mouse_pos[1]
+        
+        # 将鼠标重置到窗口中心
+        pygame.mouse.set_pos(self.center)
+        self.last_mouse_pos = self.center
+        return dx, dy
+    
+    def stop(self):
+        pygame.event.set_grab(False)
+        pygame.mouse.set_visible(True)
+
+class NullBackend(RelativeMouseBackend):
+    """不读取任何设备，移动量只来自 handle_event，用于无界面测试和回放"""
+    def start(self, center):
+        pass
+    
+    def stop(self):
+        pass
+
+INPUT_BACKENDS = {
+    "relative": RelativeMouseBackend,
+    "win32": Win32CursorBackend,
+    None: NullBackend,
+}
+
+def create_backend(name):
+    """按名称创建输入后端"""
+    if name not in INPUT_BACKENDS:
+        raise ValueError(f"未知的输入后端: {name}")
+    return INPUT_BACKENDS[name]()
@@ -0,0 +1,46 @@
+from collections import deque
+import pygame
+from src.utils.clock import RealClock, NS_PER_MS
+
+class InputSampler:
+    """在两帧之间等待输入事件并记录到达的时间戳
+    
+    主循环在两帧之间等待时阻塞在 pygame.event.wait 上，事件一到达就被读取
+    并打上时间戳，精度与渲染帧率无关，没有输入时也不占用CPU。SDL的事件队列
+    只能在主线程读取，所以采样在主循环的等待过程中完成，而不是放在单独的线程里。
+    """
+    def __init__(self, clock=None):
+        self.clock = clock or RealClock()
+        # (时间戳纳秒, 事件)，按时间顺序排列
+        self.events = deque()
+    
+    def poll(self):
+        """读取SDL队列中的事件并打上当前时间戳"""
+        events = pygame.event.get()
+        if events:
+            now = self.clock.now_ns()
+            for event in events:
+                self.events.append((now, event))
+    
+    def drain(self):
+        """取出所有已采样的事件"""
+        self.poll()
+        events = list(self.events)
+        self.events.clear()
+        return events
+    
+    def wait_until(self, deadline):
+        """等待到指定时间，期间事件到达时立即读取
+        event.wait 只有毫秒精度并且可能多等一点，最后不到2毫秒交给时钟精确等待
+        """
+        if not self.clock.simulated:
+            while True:
+                timeout = (deadline - self.clock.now_ns()) // NS_PER_MS - 1
+                if timeout < 1:
+                    break
+                event = pygame.event.wait(timeout)
+                if event.type != pygame.NOEVENT:
+                    self.events.append((self.clock.now_ns(), event))
+                    self.poll()
+        self.poll()
+        self.clock.sleep_until(deadline)
@@ -0,0 +1,90 @@
+import atexit
+import queue
+import threading
+
+# 队列中的特殊任务
+_FLUSH = object()
+_STOP = object()
+
+class PersistenceWorker:
+    """在后台线程中执行所有写盘操作
+    
+    游戏线程只把写盘任务放进有界队列，不等待磁盘。队列满时 submit 会阻塞，
+    避免磁盘跟不上时内存无限增长。
+    每个任务可以带一个 sync 函数(通常是fsync)，同一个 sync 在 fsync_batch
+    次写入后才执行一次，把多次fsync合并；flush() 和程序退出时总会执行。
+    """
+    def __init__(self, max_pending=64, fsync_batch=1):
+        self.queue = queue.Queue(max_pending)
+        self.fsync_batch = fsync_batch
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.closed = False
+        # 程序退出前写完所有任务
+        atexit.register(self.close)
+    
+    def submit(self, task=None, sync=None):
+        """提交写盘任务，sync 为写完后需要执行的同步函数"""
+        if self.closed:
+            # 退出之后不再有后台线程，直接执行
+            if task:
+                task()
+            if sync:
+                sync()
+            return
+        self.queue.put((task, sync))
+    
+    def flush(self):
+        """等待已提交的任务全部写入并同步到磁盘"""
+        if not self.closed:
+            self.queue.put((_FLUSH, None))
+            self.queue.join()
+    
+    def close(self):
+        if self.closed:
+            return
+        self.queue.put((_STOP, None))
+        self.thread.join()
+        self.closed = True
+    
+    def _run(self):
+        # 待执行的 sync 函数 -> 写入次数，dict 保持提交顺序
+        pending = {}
+        while True:
+            task, sync = self.queue.get()
+            try:
+                if task is _FLUSH or task is _STOP:
+                    self._sync(pending, force=True)
+                    if task is _STOP:
+                        return
+                    continue
+                try:
+                    if task:
+                        task()
+                except Exception as e:
+                    print(f"Error saving data: {e}")
+                if sync:
+                    pending[sync] = pending.get(sync, 0) + 1
+                self._sync(pending)
+            finally:
+                self.queue.task_done()
+    
+    def _sync(self, pending, force=False):
+        for sync, writes in list(pending.items()):
+            if force or writes >= self.fsync_batch:
+                try:
+                    sync()
+                except Exception as e:
+                    print(f"Error syncing data: {e}")
+                del pending[sync]
+
+_worker = None
+
+def get_worker(fsync_batch=None):
+    """进程共用的写盘线程，所有 ScoreManager 的写入按提交顺序执行"""
+    global _worker
+    if _worker is None:
+        _worker = PersistenceWorker()
+    if fsync_batch is not None:
+        _worker.fsync_batch = fsync_batch
+    return _worker
@@ -0,0 +1,162 @@
+import atexit
+import json
+import os
+import time
+from array import array
+import pygame
+
+# 每帧记录的阶段
+PHASES = ("events", "sensitivity", "update", "draw", "flip")
+
+class FrameProfiler:
+    """逐帧的分阶段计时
+    
+    每个阶段的开始时间和耗时(纳秒)写入预先分配好的环形缓冲区，
+    记录时不产生新的Python对象。可以在游戏中显示帧时间曲线和p50/p99，
+    也可以导出为Chrome trace_event格式(chrome://tracing 或 Perfetto)。
+    """
+    enabled = True
+    
+    def __init__(self, capacity=2048):
+        self.capacity = capacity
+        self.phase_index = {name: i for i, name in enumerate(PHASES)}
+        slots = capacity * len(PHASES)
+        self.phase_starts = array("q", bytes(8 * slots))
+        self.phase_durations = array("q", bytes(8 * slots))
+        self.frame_starts = array("q", bytes(8 * capacity))
+        self.frame_durations = array("q", bytes(8 * capacity))
+        # 正在计时的阶段的开始时间
+        self.open_phases = array("q", bytes(8 * len(PHASES)))
+        
+        self.frame = 0
+        self.slot = 0
+        
+        # 游戏内显示的统计，每隔一段时间更新一次
+        self.overlay_interval = 30
+        self.p50 = 0.0
+        self.p99 = 0.0
+    
+    def begin_frame(self):
+        self.slot = self.frame % self.capacity
+        self.frame_starts[self.slot] = time.perf_counter_ns()
+        base = self.slot * len(PHASES)
+        for i in range(len(PHASES)):
+            self.phase_durations[base + i] = 0
+    
+    def end_frame(self):
+        self.frame_durations[self.slot] = time.perf_counter_ns() - self.frame_starts[self.slot]
+        self.frame += 1
+        if self.frame % self.overlay_interval == 0:
+            self.p50, self.p99 = self.percentiles((50, 99))
+    
+    def begin(self, phase):
+        self.open_phases[self.phase_index[phase]] = time.perf_counter_ns()
+    
+    def end(self, phase):
+        """结束一个阶段；同一帧内多次出现的阶段累计耗时，保留第一次的开始时间"""
+        now = time.perf_counter_ns()
+        index = self.phase_index[phase]
+        start = self.open_phases[index]
+        slot = self.slot * len(PHASES) + index
+        if self.phase_durations[slot] == 0:
+            self.phase_starts[slot] = start
+        self.phase_durations[slot] += now - start
+    
+    def _recorded_slots(self, limit=None):
+        """按时间顺序返回已记录的槽位，limit 限制只返回最近的几帧"""
+        count = min(self.frame, self.capacity, limit or self.capacity)
+        first = self.frame - count
+        return [(first + i) % self.capacity for i in range(count)]
+    
+    def frame_times_ms(self, limit=None):
+        return [self.frame_durations[slot] / 1e6 for slot in self._recorded_slots(limit)]
+    
+    def percentiles(self, ps):
+        """帧时间的百分位数(毫秒)"""
+        times = sorted(self.frame_times_ms())
+        if not times:
+            return tuple(0.0 for _ in ps)
+        return tuple(times[min(len(times) - 1, int(len(times) * p / 100))] for p in ps)
+    
+    def draw_overlay(self, screen, width=240, height=60, max_ms=33.3):
+        """在右上角绘制帧时间曲线和p50/p99，返回绘制的区域"""
+        from src.utils.assets import render_text
+        
+        rect = pygame.Rect(screen.get_width() - width - 10, 10, width, height + 24)
+        pygame.draw.rect(screen, (0, 0, 0), rect)
+        
+        times = self.frame_times_ms(width)
+        if len(times) > 1:
+            points = [
+                (rect.left + i, rect.top + height - min(height, int(t / max_ms * height)))
+                for i, t in enumerate(times)
+            ]
+            pygame.draw.lines(screen, (0, 255, 0), False, points)
+        # 16.7ms (60 FPS) 参考线
+        y = rect.top + height - int(16.7 / max_ms * height)
+        pygame.draw.line(screen, (90, 90, 90), (rect.left, y), (rect.right, y))
+        
+        text = render_text(f"p50 {self.p50:.2f}ms  p99 {self.p99:.2f}ms", 20,
+                           (255, 255, 255), path=None)
+        screen.blit(text, (rect.left + 4, rect.top + height + 4))
+        return rect
+    
+    def export_chrome_trace(self, path):
+        """导出为Chrome trace_event格式的JSON"""
+        events = []
+        for slot in self._recorded_slots():
+            events.append({
+                "name": "frame", "ph": "X", "pid": 1, "tid": 1,
+                "ts": self.frame_starts[slot] / 1000,
+                "dur": self.frame_durations[slot] / 1000,
+            })
+            base = slot * len(PHASES)
+            for i, name in enumerate(PHASES):
+                duration = self.phase_durations[base + i]
+                if duration:
+                    events.append({
+                        "name": name, "ph": "X", "pid": 1, "tid": 1,
+                        "ts": self.phase_starts[base + i] / 1000,
+                        "dur": duration / 1000,
+                    })
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+class NullProfiler:
+    """关闭性能分析时使用，所有方法都是空操作"""
+    enabled = False
+    
+    def begin_frame(self):
+        pass
+    
+    def end_frame(self):
+        pass
+    
+    def begin(self, phase):
+        pass
+    
+    def end(self, phase):
+        pass
+    
+    def draw_overlay(self, screen):
+        return None
+
+_profiler = None
+
+def get_profiler():
+    """进程共用的性能分析器，设置环境变量 AIM_PROFILE=1 或使用 --profile 启动时开启
+    退出时把记录导出到 AIM_PROFILE_OUT (默认 data/profile_trace.json)
+    """
+    global _profiler
+    if _profiler is None:
+        if os.environ.get("AIM_PROFILE") == "1":
+            _profiler = FrameProfiler()
+            out = os.environ.get("AIM_PROFILE_OUT", "data/profile_trace.json")
+            atexit.register(_profiler.export_chrome_trace, out)
+        else:
+            _profiler = NullProfiler()
+    return _profiler
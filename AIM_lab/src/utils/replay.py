@@ -0,0 +1,305 @@
+"""游戏录像的录制和回放
+
+录像文件 (.aimr) 由固定长度的文件头和固定长度的记录组成:
+    文件头: 魔数 b"AIMR", 版本, 记录长度, 目标半径, 模式名
+    记录:   距上一条记录的微秒数(uint32), a(int16), b(int16), 类型(uint8), 参数(uint8)
+记录类型:
+    FRAME  准心移动，a/b 为相对上一个准心位置的增量
+    SHOT   点击，a/b 同上，参数为1表示击中
+    TARGET 目标出现，a/b 为目标的绝对坐标，参数为目标编号
+
+回放: python -m src.utils.replay data/replays/xxx.aimr [--fast]
+"""
+import atexit
+import mmap
+import os
+import queue
+import struct
+import threading
+from datetime import datetime
+
+MAGIC = b"AIMR"
+VERSION = 2
+HEADER = struct.Struct("<4sHHH22s")
+RECORD = struct.Struct("<IhhBB")
+
+FRAME = 0
+SHOT = 1
+TARGET = 2
+
+class _ChunkWriter:
+    """后台线程，把录像数据块追加写入文件，不阻塞主循环"""
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+    
+    def write(self, path, data):
+        self.queue.put((path, data))
+    
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                return
+            path, data = item
+            try:
+                with open(path, "ab") as f:
+                    f.write(data)
+            except OSError as e:
+                print(f"Error writing replay: {e}")
+    
+    def close(self):
+        """写完队列中剩余的数据，程序退出时自动调用"""
+        self.queue.put(None)
+        self.thread.join()
+
+_writer = None
+
+def _get_writer():
+    global _writer
+    if _writer is None:
+        _writer = _ChunkWriter()
+    return _writer
+
+class ReplayRecorder:
+    """录制一局游戏
+    
+    记录直接打包进预先分配好的缓冲区，每攒满 chunk_records 条交给后台线程写入文件，
+    不会为每条记录保留Python对象。准心位置只在变化时记录。
+    """
+    def __init__(self, path, mode_name, start_ns, target_radius=0, chunk_records=4096):
+        self.path = path
+        self.chunk_records = chunk_records
+        self.buffer = bytearray(RECORD.size * chunk_records)
+        self.count = 0
+        self.last_ns = start_ns
+        self.x = 0
+        self.y = 0
+        self.closed = False
+        
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        header = HEADER.pack(MAGIC, VERSION, RECORD.size, target_radius, mode_name.encode()[:22])
+        _get_writer().write(path, header)
+    
+    def _append(self, time_ns, kind, a, b, arg=0):
+        delta_us = min(max(0, (time_ns - self.last_ns) // 1000), 0xFFFFFFFF)
+        # 按写入的微秒数累加，避免舍入误差越积越多
+        self.last_ns += delta_us * 1000
+        RECORD.pack_into(self.buffer, self.count * RECORD.size, delta_us, a, b, kind, arg)
+        self.count += 1
+        if self.count == self.chunk_records:
+            self.flush()
+    
+    def crosshair(self, time_ns, x, y):
+        """记录准心位置，没有移动时不记录"""
+        x, y = int(x), int(y)
+        if x == self.x and y == self.y:
+            return
+        self._append(time_ns, FRAME, x - self.x, y - self.y)
+        self.x, self.y = x, y
+    
+    def shot(self, time_ns, x, y, hit):
+        """记录一次点击"""
+        x, y = int(x), int(y)
+        self._append(time_ns, SHOT, x - self.x, y - self.y, 1 if hit else 0)
+        self.x, self.y = x, y
+    
+    def target(self, time_ns, index, x, y):
+        """记录目标出现的位置"""
+        self._append(time_ns, TARGET, int(x), int(y), index)
+    
+    def flush(self):
+        if self.count:
+            _get_writer().write(self.path, bytes(self.buffer[:self.count * RECORD.size]))
+            self.count = 0
+    
+    def close(self):
+        if not self.closed:
+            self.flush()
+            self.closed = True
+
+class NullRecorder:
+    """关闭录像时使用，所有方法都是空操作"""
+    def crosshair(self, time_ns, x, y):
+        pass
+    
+    def shot(self, time_ns, x, y, hit):
+        pass
+    
+    def target(self, time_ns, index, x, y):
+        pass
+    
+    def close(self):
+        pass
+
+def create_recorder(replay_dir, mode_name, start_ns, target_radius=0):
+    """在 replay_dir 中新建一局录像，replay_dir 为None时不录制"""
+    if not replay_dir:
+        return NullRecorder()
+    name = f"{mode_name}-{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.aimr"
+    return ReplayRecorder(os.path.join(replay_dir, name), mode_name, start_ns, target_radius)
+
+def list_replays(replay_dir="data/replays", mode=None):
+    """按时间顺序返回录像文件路径，可以只返回某个模式的录像"""
+    if not os.path.isdir(replay_dir):
+        return []
+    prefix = f"{mode}-" if mode else ""
+    return sorted(
+        os.path.join(replay_dir, name) for name in os.listdir(replay_dir)
+        if name.endswith(".aimr") and name.startswith(prefix)
+    )
+
+class ReplayReader:
+    """以内存映射方式读取录像，按需解码，不会把整个文件读入Python对象"""
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "rb")
+        try:
+            self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, version, record_size, self.target_radius, mode = HEADER.unpack_from(self.data, 0)
+        except (ValueError, struct.error):
+            self.file.close()
+            raise ValueError(f"{path} 不是有效的录像文件")
+        if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+            self.close()
+            raise ValueError(f"{path} 不是有效的录像文件或版本不匹配")
+        self.mode = mode.rstrip(b"\0").decode()
+        # 最后一条记录可能只写了一半(录制中或程序崩溃)，忽略
+        self.count = (len(self.data) - HEADER.size) // RECORD.size
+    
+    def __len__(self):
+        return self.count
+    
+    def __iter__(self):
+        """逐条返回 (时间纳秒, 类型, x, y, 参数)，时间从录制开始算起，坐标已还原为绝对值"""
+        time_ns = 0
+        x = y = 0
+        for i in range(self.count):
+            delta_us, a, b, kind, arg = RECORD.unpack_from(self.data, HEADER.size + i * RECORD.size)
+            time_ns += delta_us * 1000
+            if kind == TARGET:
+                yield time_ns, kind, a, b, arg
+            else:
+                x += a
+                y += b
+                yield time_ns, kind, x, y, arg
+    
+    def close(self):
+        self.data.close()
+        self.file.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+class ReplayPlayer:
+    """用游戏模式自身的主循环和 _draw 回放录像
+    
+    mode 应该是一个新建的、不录像的游戏模式实例。模式的时钟为
+    SimulatedClock 时不等待，可以用来快速渲染或检查录像。
+    """
+    def __init__(self, mode, reader):
+        self.mode = mode
+        self.reader = reader
+    
+    def run(self):
+        """回放到结束返回True，关闭窗口返回False"""
+        import pygame
+        
+        mode = self.mode
+        records = iter(self.reader)
+        pending = [next(records, None)]
+        start_ns = mode.clock.now_ns()
+        mode.start_time = mode.clock.now_ms()
+        # 上一次逻辑更新时的准心位置
+        previous = [(mode.crosshair_x, mode.crosshair_y)]
+        
+        def handle_events():
+            for _, event in mode.sampler.drain():
+                if event.type == pygame.QUIT:
+                    return False
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    return True
+            if pending[0] is None:
+                return True
+            return None
+        
+        def update(dt):
+            previous[0] = (mode.crosshair_x, mode.crosshair_y)
+            now = mode.clock.now_ns() - start_ns
+            while pending[0] is not None and pending[0][0] <= now:
+                self._apply(*pending[0])
+                pending[0] = next(records, None)
+            mode.time_left = max(0, mode.game_duration - now // 1_000_000_000)
+        
+        def crosshair_pos(alpha):
+            # 回放的准心由录像驱动，是按逻辑步长更新的状态，在两次更新之间插值
+            prev_x, prev_y = previous[0]
+            return (int(prev_x + (mode.crosshair_x - prev_x) * alpha),
+                    int(prev_y + (mode.crosshair_y - prev_y) * alpha))
+        
+        mode._crosshair_pos = crosshair_pos
+        try:
+            return mode.loop.run(handle_events, update, mode._draw)
+        finally:
+            mode.sensitivity.cleanup()
+    
+    def _apply(self, time_ns, kind, x, y, arg):
+        mode = self.mode
+        if kind == TARGET:
+            if hasattr(mode, "targets"):
+                while len(mode.targets) <= arg:
+                    mode.targets.append([x, y])
+                mode.targets[arg] = [x, y]
+            else:
+                mode.target_x, mode.target_y = x, y
+            return
+        
+        mode.crosshair_x, mode.crosshair_y = x, y
+        if kind == SHOT:
+            mode.shots_fired += 1
+            if arg:
+                mode.hits += 1
+                mode.score += mode.hit_score
+            else:
+                mode.score = max(0, mode.score - mode.miss_penalty)
+
+def main():
+    import argparse
+    import pygame
+    from src.settings import Settings
+    from src.modes import create_mode
+    from src.utils.clock import SimulatedClock
+    
+    parser = argparse.ArgumentParser(description="回放游戏录像")
+    parser.add_argument("path")
+    parser.add_argument("--fast", action="store_true", help="使用模拟时间，不按实际速度播放")
+    args = parser.parse_args()
+    
+    settings = Settings()
+    # 回放时不读取鼠标、不录像
+    settings.input_backend = None
+    settings.replay_dir = None
+    
+    pygame.init()
+    screen = pygame.display.set_mode((settings.screen_width, settings.screen_height))
+    with ReplayReader(args.path) as reader:
+        pygame.display.set_caption(f"Replay - {reader.mode}")
+        clock = SimulatedClock() if args.fast else None
+        if args.fast:
+            settings.max_fps = 0
+        mode = create_mode(reader.mode, screen, settings, clock=clock)
+        # 目标全部来自录像
+        if hasattr(mode, "targets"):
+            mode.targets.clear()
+        ReplayPlayer(mode, reader).run()
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
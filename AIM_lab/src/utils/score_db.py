@@ -0,0 +1,179 @@
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    mode TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    accuracy REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_scores_mode_time ON scores (mode, timestamp);
+"""
+
+def format_time(value):
+    """把 datetime 转换为与记录相同格式的字符串"""
+    if isinstance(value, datetime):
+        return value.strftime(TIME_FORMAT)
+    return value
+
+class ScoreDatabase:
+    """基于SQLite的分数存储，按 (mode, timestamp) 建立索引
+    
+    使用WAL模式，多个游戏实例可以同时读写同一个数据库: 读不阻塞写，
+    写入冲突时最多等待 busy_timeout 秒，而不是立即报错。
+    每条记录插入后尽快提交: 把多条记录攒在一个事务里会一直持有写锁，
+    其他实例在这期间无法保存成绩，也看不到这些记录。
+    批量fsync改由 synchronous 控制: "FULL" 每次提交都fsync；"NORMAL" 只在
+    检查点时fsync，断电时可能丢失最近几次提交，但数据库不会损坏。
+    主线程和后台写盘线程共用一个连接，所有操作都在 lock 内进行。
+    """
+    def __init__(self, db_file="data/scores.db", busy_timeout=10.0, synchronous="FULL"):
+        self.db_file = db_file
+        self.conn = sqlite3.connect(db_file, timeout=busy_timeout, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(f"PRAGMA busy_timeout={int(busy_timeout * 1000)}")
+        self.conn.execute(f"PRAGMA synchronous={synchronous}")
+        self.conn.executescript(SCHEMA)
+        self.lock = threading.RLock()
+    
+    def close(self):
+        with self.lock:
+            self.conn.close()
+    
+    def add_record(self, mode_name, record):
+        """插入一条记录，本连接的查询立即可以看到；调用 commit() 后写入磁盘、对其他实例可见"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO scores (mode, timestamp, score, accuracy) VALUES (?, ?, ?, ?)",
+                (mode_name, record["timestamp"], record["score"], record["accuracy"])
+            )
+    
+    def commit(self):
+        with self.lock:
+            self.conn.commit()
+    
+    def import_scores(self, scores):
+        """批量导入 {模式: [记录]} 格式的数据"""
+        rows = [
+            (mode, r["timestamp"], r["score"], r["accuracy"])
+            for mode, records in scores.items()
+            for r in records
+        ]
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO scores (mode, timestamp, score, accuracy) VALUES (?, ?, ?, ?)",
+                rows
+            )
+        return len(rows)
+    
+    def get_modes(self):
+        """所有有记录的模式"""
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT DISTINCT mode FROM scores")]
+    
+    def count(self, mode_name, raw_before=None):
+        """指定模式的记录数"""
+        clause, params = self._where(mode_name, raw_before=raw_before)
+        with self.lock:
+            return self.conn.execute(
+                f"SELECT COUNT(*) FROM scores WHERE {clause}", params
+            ).fetchone()[0]
+    
+    def get_history(self, mode_name, offset=0, limit=None, raw_before=None):
+        """按时间顺序分页获取历史记录"""
+        clause, params = self._where(mode_name, raw_before=raw_before)
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT timestamp, score, accuracy FROM scores WHERE {clause} "
+                "ORDER BY timestamp, id LIMIT ? OFFSET ?",
+                params + [-1 if limit is None else limit, offset]
+            ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def get_before(self, cutoff):
+        """所有模式中时间早于 cutoff 的记录 {模式: [记录]}"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT mode, timestamp, score, accuracy FROM scores WHERE timestamp < ? "
+                "ORDER BY mode, timestamp, id",
+                (cutoff,)
+            ).fetchall()
+        expired = {}
+        for row in rows:
+            expired.setdefault(row["mode"], []).append(
+                {"timestamp": row["timestamp"], "score": row["score"], "accuracy": row["accuracy"]}
+            )
+        return expired
+    
+    def delete_before(self, cutoff):
+        """删除时间早于 cutoff 的记录"""
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM scores WHERE timestamp < ?", (cutoff,))
+    
+    def _where(self, mode_name, start=None, end=None, raw_before=None):
+        """生成按模式和时间范围过滤的条件
+        raw_before: 这之前的记录已经汇总，删除之前中途退出时残留的行不再计入
+        """
+        clause = "mode = ?"
+        params = [mode_name]
+        if raw_before is not None:
+            clause += " AND timestamp >= ?"
+            params.append(raw_before)
+        if start is not None:
+            clause += " AND timestamp >= ?"
+            params.append(format_time(start))
+        if end is not None:
+            clause += " AND timestamp <= ?"
+            params.append(format_time(end))
+        return clause, params
+    
+    def get_range(self, mode_name, start=None, end=None, raw_before=None):
+        """获取 [start, end] 时间范围内的记录"""
+        clause, params = self._where(mode_name, start, end, raw_before)
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT timestamp, score, accuracy FROM scores WHERE {clause} "
+                "ORDER BY timestamp, id",
+                params
+            ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def get_stats(self, mode_name, start=None, end=None, raw_before=None):
+        """在SQL中计算汇总数据"""
+        clause, params = self._where(mode_name, start, end, raw_before)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*) AS count, MAX(score) AS best, AVG(score) AS average, "
+                "MAX(accuracy) AS best_accuracy, AVG(accuracy) AS average_accuracy "
+                f"FROM scores WHERE {clause}",
+                params
+            ).fetchone()
+        return dict(row)
+
+def migrate_json_to_sqlite(json_file="data/scores.json", db_file="data/scores.db"):
+    """把JSON格式(快照和日志)的分数导入SQLite，返回导入的记录数"""
+    from src.utils.score_journal import ScoreJournal
+    
+    journal_file = os.path.join(os.path.dirname(json_file), "scores.journal")
+    scores = ScoreJournal(json_file, journal_file).load()
+    db = ScoreDatabase(db_file)
+    try:
+        if any(db.count(mode) for mode in scores):
+            raise RuntimeError(f"{db_file} 中已经有数据，为避免重复不再导入")
+        return db.import_scores(scores)
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    # 用法: python -m src.utils.score_db [scores.json] [scores.db]
+    args = sys.argv[1:]
+    count = migrate_json_to_sqlite(*args)
+    print(f"已导入 {count} 条记录")
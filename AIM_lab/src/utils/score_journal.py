@@ -0,0 +1,172 @@
+import bisect
+import json
+import os
+import threading
+from src.utils.file_lock import FileLock
+
+class ScoreJournal:
+    """追加写入的分数日志
+    
+    scores.json 作为快照，之后的每局成绩以一行JSON追加到日志文件中，
+    保存一局成绩的开销与历史记录数量无关。日志条数超过阈值时在后台线程
+    把日志合并进快照。旧版本的 scores.json 直接作为快照读取，无需迁移。
+    多个游戏实例可以共用同一个 data 目录: 读取、追加和合并都在文件锁内进行，
+    合并时从磁盘重新读取快照和日志，不会用某个实例内存中的数据覆盖其他实例
+    写入的记录。
+    """
+    def __init__(self, snapshot_file="data/scores.json", journal_file="data/scores.journal",
+                 compact_threshold=50):
+        self.snapshot_file = snapshot_file
+        self.journal_file = journal_file
+        # 合并过程中被轮换出去的日志
+        self.compacting_file = journal_file + ".compacting"
+        self.compact_threshold = compact_threshold
+        self.file_lock = FileLock(snapshot_file + ".lock")
+        
+        # 本实例看到的日志条数，其他实例的追加在下次读取时才计入
+        self.journal_entries = 0
+        self.compact_thread = None
+    
+    def load(self):
+        """读取快照并重放日志，返回 {模式: [记录]}"""
+        with self.file_lock:
+            scores, self.journal_entries = self._read()
+        return scores
+    
+    def _read(self):
+        """读取磁盘上的全部记录，返回 ({模式: [记录]}, 日志条数)，调用方持有文件锁"""
+        scores = self._read_snapshot()
+        
+        # 上次合并中途退出：快照可能已经包含了这部分记录，需要去重
+        if os.path.exists(self.compacting_file):
+            seen = {
+                mode: {self._record_key(r) for r in records}
+                for mode, records in scores.items()
+            }
+            for mode, record in self._replay(self.compacting_file):
+                if self._record_key(record) not in seen.get(mode, ()):
+                    scores.setdefault(mode, []).append(record)
+        
+        entries = 0
+        for mode, record in self._replay(self.journal_file):
+            scores.setdefault(mode, []).append(record)
+            entries += 1
+        
+        # 多个实例的追加顺序与时间可能略有出入，排序后才能按时间二分查找
+        for records in scores.values():
+            records.sort(key=lambda r: r["timestamp"])
+        return scores, entries
+    
+    def append(self, mode_name, record, sync=True):
+        """追加一条记录，sync 为False时不立即fsync，由调用方稍后调用 sync()"""
+        line = json.dumps({"mode": mode_name, "record": record}) + "\n"
+        with self.file_lock:
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                if sync:
+                    os.fsync(f.fileno())
+            self.journal_entries += 1
+        
+        if self.journal_entries >= self.compact_threshold:
+            self.compact_async()
+    
+    def sync(self):
+        """把已追加的日志同步到磁盘"""
+        if os.path.exists(self.journal_file):
+            with open(self.journal_file, "a", encoding="utf-8") as f:
+                os.fsync(f.fileno())
+    
+    def compact(self, cutoff=None):
+        """把日志合并进快照，cutoff 不为None时同时删除时间早于 cutoff 的记录
+        在文件锁内从磁盘重新读取，其他实例追加的记录也会合并进来
+        """
+        with self.file_lock:
+            data, _ = self._read()
+            if cutoff:
+                data = {
+                    mode: records[self._split(records, cutoff):]
+                    for mode, records in data.items()
+                }
+                data = {mode: records for mode, records in data.items() if records}
+            # 先轮换日志再写快照，中途退出时读取会去重
+            if os.path.exists(self.journal_file):
+                os.replace(self.journal_file, self.compacting_file)
+            self._write_snapshot(data)
+            if os.path.exists(self.compacting_file):
+                os.remove(self.compacting_file)
+            self.journal_entries = 0
+    
+    def compact_async(self):
+        """在后台线程中合并日志"""
+        if self.compact_thread and self.compact_thread.is_alive():
+            return
+        self.compact_thread = threading.Thread(target=self.compact, daemon=True)
+        self.compact_thread.start()
+    
+    def wait(self):
+        """等待后台合并完成"""
+        if self.compact_thread:
+            self.compact_thread.join()
+    
+    def get_before(self, cutoff):
+        """时间早于 cutoff 的记录 {模式: [记录]}"""
+        with self.file_lock:
+            data, _ = self._read()
+        return {
+            mode: records[:self._split(records, cutoff)]
+            for mode, records in data.items()
+            if self._split(records, cutoff)
+        }
+    
+    def expire(self, cutoff):
+        """删除时间早于 cutoff 的记录，重写快照"""
+        self.compact(cutoff)
+    
+    @staticmethod
+    def _split(records, cutoff):
+        """记录按时间排序，返回第一条不早于 cutoff 的记录的下标"""
+        return bisect.bisect_left(records, cutoff, key=lambda r: r["timestamp"])
+    
+    def _read_snapshot(self):
+        """读取快照文件"""
+        try:
+            with open(self.snapshot_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _write_snapshot(self, data):
+        """原子地写入快照：先写临时文件再替换"""
+        tmp_file = self.snapshot_file + ".tmp"
+        with open(tmp_file, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_file, self.snapshot_file)
+    
+    def _replay(self, path):
+        """逐行读取日志，遇到写了一半的行时截断到最后一条完整记录"""
+        if not os.path.exists(path):
+            return
+        
+        good_size = 0
+        with open(path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                    mode, record = entry["mode"], entry["record"]
+                except (ValueError, KeyError, TypeError):
+                    break
+                good_size += len(line)
+                yield mode, record
+        
+        if good_size < os.path.getsize(path):
+            with open(path, "r+b") as f:
+                f.truncate(good_size)
+    
+    @staticmethod
+    def _record_key(record):
+        return (record.get("timestamp"), record.get("score"), record.get("accuracy"))
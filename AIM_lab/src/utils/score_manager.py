@@ -1,14 +1,83 @@
+import bisect
 import json
 import os
-from datetime import datetime
-import matplotlib.pyplot as plt
-import io
+from datetime import datetime, timedelta
+from collections import OrderedDict
+from functools import partial
 import pygame
+from src.utils.chart import draw_line_chart, draw_placeholder
+from src.utils.score_journal import ScoreJournal
+from src.utils.score_stats import ScoreStats
+from src.utils.score_rollup import ScoreRollups
+from src.utils.persistence import get_worker
+from src.utils.file_lock import FileLock
+
+# 图表后端: pygame直接绘制，matplotlib为可选后端
+GRAPH_BACKENDS = ("pygame", "matplotlib")
 
 class ScoreManager:
-    def __init__(self):
+    """历史成绩的存储、统计和图表
+    
+    主菜单创建一个实例，游戏模式共用这个实例。多个游戏实例可以共用同一个
+    data 目录: JSON日志在文件锁内追加和合并，SQLite使用WAL模式，
+    保存时只追加新记录，不会覆盖其他实例的结果。
+    """
+    @classmethod
+    def from_settings(cls, settings):
+        """按设置创建"""
+        return cls(
+            graph_cache_dir=settings.graph_cache_dir,
+            graph_backend=settings.graph_backend,
+            backend=settings.score_backend,
+            replay_dir=settings.replay_dir,
+            fsync_batch=settings.score_fsync_batch,
+            graph_workers=settings.graph_workers,
+            raw_days=settings.score_raw_days,
+            daily_days=settings.score_daily_days
+        )
+    
+    def __init__(self, graph_cache_size=8, graph_cache_dir=None, graph_backend="pygame",
+                 backend="json", replay_dir=None, fsync_batch=1, graph_workers=0,
+                 downsample="lttb", raw_days=None, daily_days=365):
         self.scores_file = "data/scores.json"
+        self.db_file = "data/scores.db"
+        self.journal = ScoreJournal(self.scores_file, "data/scores.journal")
+        # 存储后端: "json" 全部加载到内存，"sqlite" 按需查询
+        self.backend = backend
+        self.db = None
+        # 每个模式的增量统计(均值、方差、EWMA、最高分、分位数)，不需要扫描历史记录
+        self.stats = ScoreStats("data/stats.json")
+        # 保留策略: 原始记录保留 raw_days 天(None 表示永久保留)，之后按天汇总，
+        # 超过 daily_days 天的按天汇总再合并为按周汇总
+        self.raw_days = raw_days
+        self.daily_days = daily_days
+        self.rollups = ScoreRollups("data/rollups.json")
+        # 后台写盘线程，保存成绩时游戏线程不等待磁盘；每 fsync_batch 次写入同步一次
+        self.fsync_batch = fsync_batch
+        self.worker = get_worker(fsync_batch)
+        
+        # 历史图表缓存: (模式, 记录数, 宽, 高, 后端) -> (分数图, 准确率图)，按LRU淘汰
+        self.graph_cache = OrderedDict()
+        self.graph_cache_size = graph_cache_size
+        # 可选的磁盘PNG缓存目录，冷启动时可以跳过matplotlib；只用于matplotlib后端
+        self.graph_cache_dir = graph_cache_dir
+        self.graph_backend = graph_backend
+        # graph_workers > 0 时matplotlib图表在子进程中绘制，画好之前显示占位图
+        self.renderer = None
+        if graph_workers:
+            from src.utils.graph_renderer import GraphRenderer
+            self.renderer = GraphRenderer(graph_workers)
+        # 正在绘制的图表 -> 画好后写入的磁盘缓存路径
+        self.pending_graph_paths = {}
+        self.placeholders = {}
+        # 图表的下采样方法: "lttb"、"minmax" 或 None(画出所有记录)
+        self.downsample = downsample
+        # 录像目录，用于计算瞄准指标
+        self.replay_dir = replay_dir
+        
         self.ensure_data_dir()
+        if self.backend == "sqlite":
+            self._open_database()
         self.load_scores()
     
     def ensure_data_dir(self):
@@ -18,83 +87,389 @@ class ScoreManager:
             with open(self.scores_file, "w") as f:
                 json.dump({}, f)
     
+    def _open_database(self):
+        """打开SQLite数据库，首次创建时自动导入JSON中的历史记录"""
+        # 只有使用SQLite后端时才导入sqlite3
+        from src.utils.score_db import ScoreDatabase, migrate_json_to_sqlite
+        # 多个实例同时首次启动时只导入一次
+        with FileLock(self.db_file + ".lock"):
+            if not os.path.exists(self.db_file):
+                migrate_json_to_sqlite(self.scores_file, self.db_file)
+        # SQLite每条记录单独提交，fsync_batch > 1 时改为只在检查点fsync
+        self.db = ScoreDatabase(self.db_file, synchronous="FULL" if self.fsync_batch <= 1 else "NORMAL")
+    
     def load_scores(self):
-        """加载历史分数"""
-        try:
-            with open(self.scores_file, "r") as f:
-                self.scores = json.load(f)
-        except:
+        """加载历史分数：读取快照并重放日志"""
+        # 先写完后台队列中的数据
+        self.worker.flush()
+        self.rollups.load()
+        if self.db:
+            # SQLite后端不把历史记录加载到内存
             self.scores = {}
+        else:
+            self.journal.wait()
+            self.scores = self.journal.load()
+        # 重新加载后内存中的图表可能已经过期
+        self.graph_cache.clear()
+        self._discard_pending_graphs()
+        self._sync_stats()
+        if self.raw_days is not None:
+            self.worker.submit(self._apply_retention)
+    
+    def _sync_stats(self):
+        """统计数据与历史记录的条数不一致时(首次运行、数据被外部修改)从历史记录重建"""
+        modes = set(self.db.get_modes() if self.db else self.scores) | set(self.rollups.get_modes())
+        changed = False
+        for mode_name in modes:
+            if self.stats.count(mode_name) != self.count_records(mode_name):
+                self.stats.rebuild(mode_name, self.get_history_series(mode_name))
+                changed = True
+        if changed:
+            self.stats.save()
+    
+    def _apply_retention(self):
+        """把超过保留期的原始记录汇总为按天/按周的数据，然后从存储中删除
+        在后台写盘线程中运行；每次只处理上次之后新过期的记录
+        """
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        raw_before = (today - timedelta(days=self.raw_days)).strftime("%Y-%m-%d %H:%M:%S")
+        weekly_before = (today - timedelta(days=self.daily_days)).strftime("%Y-%m-%d")
+        # 同一时间只有一个实例在汇总，开始前读取其他实例的汇总结果
+        with self.rollups.file_lock:
+            self.rollups.load()
+            if self.rollups.raw_before and raw_before <= self.rollups.raw_before:
+                # 上次汇总后、删除前中途退出时残留的原始记录，查询时已经过滤掉
+                if self.db:
+                    self.db.delete_before(self.rollups.raw_before)
+                return
+            self._roll_up(raw_before, weekly_before)
+    
+    def _roll_up(self, raw_before, weekly_before):
+        expired = self.db.get_before(raw_before) if self.db else self.journal.get_before(raw_before)
+        # 上次汇总后没来得及删除的原始记录已经统计过了
+        done = self.rollups.raw_before
+        if done:
+            expired = {
+                mode: [r for r in records if r["timestamp"] >= done]
+                for mode, records in expired.items()
+            }
+        expired = {mode: records for mode, records in expired.items() if records}
+        
+        # 先保存汇总，再删除原始记录，中途退出也不会丢失数据
+        self.rollups.roll_up(expired, raw_before, weekly_before)
+        try:
+            self.rollups.save()
+        except OSError as e:
+            print(f"Error saving rollups: {e}")
+            return
+        if self.db:
+            self.db.delete_before(raw_before)
+        else:
+            self.journal.expire(raw_before)
+    
+    def _raw_records(self, mode_name):
+        """内存中某个模式的原始记录，去掉已经汇总过的部分"""
+        records = self.scores.get(mode_name, [])
+        done = self.rollups.raw_before
+        if done and records and records[0]["timestamp"] < done:
+            records = records[bisect.bisect_left(records, done, key=lambda r: r["timestamp"]):]
+            self.scores[mode_name] = records
+        return records
     
     def save_score(self, mode_name, score, accuracy):
-        """保存新的分数记录"""
-        if mode_name not in self.scores:
-            self.scores[mode_name] = []
-            
+        """保存新的分数记录
+        内存中的数据立即更新，写盘交给后台线程，游戏结束时不会卡顿
+        """
         # 添加新记录
         record = {
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "score": score,
             "accuracy": accuracy
         }
-        self.scores[mode_name].append(record)
         
-        # 保存到文件
-        with open(self.scores_file, "w") as f:
-            json.dump(self.scores, f)
+        if self.db:
+            # 在游戏线程中插入，结束界面的图表和统计立即包含这一局；
+            # 提交(写盘)交给后台线程，并且马上进行，不会长时间持有写锁
+            self.db.add_record(mode_name, record)
+            self.worker.submit(self.db.commit)
+        else:
+            # 追加到日志文件，不再重写整个 scores.json
+            self.scores.setdefault(mode_name, []).append(record)
+            self.worker.submit(partial(self.journal.append, mode_name, record, False),
+                               sync=self.journal.sync)
+        
+        self.stats.add(mode_name, record)
+        self.worker.submit(partial(self.stats.save, self.stats.snapshot()))
     
-    def get_mode_history(self, mode_name):
-        """获取指定模式的历史记录"""
-        return self.scores.get(mode_name, [])
+        # 该模式的图表已经过期
+        self.invalidate_graph_cache(mode_name)
     
-    def create_history_graph(self, mode_name, width=400, height=200):
-        """创建历史记录图表"""
-        records = self.get_mode_history(mode_name)
-        if not records:
+    def get_mode_history(self, mode_name, offset=0, limit=None):
+        """获取指定模式保留期内的原始记录，可以用 offset/limit 分页"""
+        if self.db:
+            return self.db.get_history(mode_name, offset, limit, self.rollups.raw_before)
+        records = self._raw_records(mode_name)
+        if offset == 0 and limit is None:
+            return records
+        end = None if limit is None else offset + limit
+        return records[offset:end]
+    
+    def count_records(self, mode_name):
+        """指定模式的记录数，包括已经汇总的记录"""
+        if self.db:
+            count = self.db.count(mode_name, self.rollups.raw_before)
+        else:
+            count = len(self._raw_records(mode_name))
+        return count + self.rollups.count(mode_name)
+    
+    def get_history_range(self, mode_name, start=None, end=None):
+        """获取时间范围 [start, end] 内的原始记录，start/end 可以是 datetime 或字符串"""
+        if self.db:
+            return self.db.get_range(mode_name, start, end, self.rollups.raw_before)
+        start, end = self._format_range(start, end)
+        return [
+            r for r in self._raw_records(mode_name)
+            if (start is None or r["timestamp"] >= start)
+            and (end is None or r["timestamp"] <= end)
+        ]
+    
+    @staticmethod
+    def _format_range(start, end):
+        """把 datetime 转换为记录中的时间字符串"""
+        if start is None and end is None:
             return None, None
-            
-        # 创建分数图表
-        plt.figure(figsize=(width/100, height/100), dpi=100)
-        plt.style.use('dark_background')
+        from src.utils.score_db import format_time
+        return format_time(start), format_time(end)
+    
+    def get_history_series(self, mode_name, start=None, end=None):
+        """完整的历史: 按周、按天的汇总数据(带 tier 字段)在前，保留期内的原始记录在后"""
+        start, end = self._format_range(start, end)
+        return self.rollups.series(mode_name, start, end) + self.get_history_range(mode_name, start, end)
+    
+    def get_mode_stats(self, mode_name, start=None, end=None):
+        """获取汇总数据: 记录数、最高分、平均分、最高准确率、平均准确率
+        已经汇总的历史按天/按周的粒度计入
+        """
+        if self.db:
+            stats = self.db.get_stats(mode_name, start, end, self.rollups.raw_before)
+        else:
+            records = self.get_history_range(mode_name, start, end)
+            stats = {"count": 0, "best": None, "average": None,
+                     "best_accuracy": None, "average_accuracy": None}
+            if records:
+                scores = [r["score"] for r in records]
+                accuracies = [r["accuracy"] for r in records]
+                stats = {
+                    "count": len(records),
+                    "best": max(scores),
+                    "average": sum(scores) / len(scores),
+                    "best_accuracy": max(accuracies),
+                    "average_accuracy": sum(accuracies) / len(accuracies),
+                }
         
-        # 提取数据
-        scores = [r["score"] for r in records]
+        for entry in self.rollups.series(mode_name, *self._format_range(start, end)):
+            count = stats["count"] + entry["count"]
+            if not stats["count"]:
+                stats = {"count": count, "best": entry["max"], "average": entry["score"],
+                         "best_accuracy": entry["best_accuracy"], "average_accuracy": entry["accuracy"]}
+                continue
+            stats = {
+                "count": count,
+                "best": max(stats["best"], entry["max"]),
+                "average": (stats["average"] * stats["count"] + entry["score"] * entry["count"]) / count,
+                "best_accuracy": max(stats["best_accuracy"], entry["best_accuracy"]),
+                "average_accuracy": (stats["average_accuracy"] * stats["count"]
+                                     + entry["accuracy"] * entry["count"]) / count,
+            }
+        return stats
+    
+    def get_mode_summary(self, mode_name):
+        """增量维护的汇总数据，与记录数无关:
+        count、mean、stddev、ewma、best、top(前10名)、median、p90、last、
+        last_rank(最近一局超过的其他记录的比例，只有一局时为None)
+        """
+        return self.stats.get(mode_name).summary()
+    
+    def get_aim_metrics(self, mode_name, limit=None):
+        """根据最近 limit 局录像计算瞄准指标的平均值和中位数:
+        击杀时间、甩枪峰值速度、过冲距离、修正次数、Fitts吞吐量
+        """
+        if not self.replay_dir:
+            return None
+        # 只在需要时才导入numpy
+        from src.utils.aim_analytics import analyze_mode
+        return analyze_mode(mode_name, self.replay_dir, limit)
+    
+    def invalidate_graph_cache(self, mode_name=None):
+        """清除图表缓存，mode_name为None时清除全部"""
+        for key in list(self.graph_cache):
+            if mode_name is None or key[0] == mode_name:
+                del self.graph_cache[key]
+        self._discard_pending_graphs(mode_name)
         
-        # 绘制得分曲线
-        plt.plot(scores, color='#00ff00', marker='o')
-        plt.title(f'Score History')
-        plt.grid(True, alpha=0.3)
+        # 在后台删除磁盘上过期的图表
+        if self.graph_cache_dir:
+            self.worker.submit(partial(self._remove_cached_graphs, mode_name))
+    
+    def _discard_pending_graphs(self, mode_name=None):
+        """丢弃正在子进程中绘制的过期图表"""
+        if self.renderer:
+            self.renderer.discard(mode_name)
+        for key in list(self.pending_graph_paths):
+            if mode_name is None or key[0] == mode_name:
+                del self.pending_graph_paths[key]
+    
+    def _remove_cached_graphs(self, mode_name):
+        if os.path.isdir(self.graph_cache_dir):
+            prefix = f"{mode_name}_" if mode_name else ""
+            for filename in os.listdir(self.graph_cache_dir):
+                if filename.startswith(prefix) and filename.endswith(".png"):
+                    try:
+                        os.remove(os.path.join(self.graph_cache_dir, filename))
+                    except OSError:
+                        pass
+    
+    def _graph_cache_paths(self, mode_name, records, width, height, backend):
+        """磁盘缓存的文件路径，文件名中带有最后一条记录的指纹"""
+        import hashlib
+        last = records[-1]
+        digest = hashlib.md5(
+            f"{last['timestamp']}|{last['score']}|{last['accuracy']}".encode("utf-8")
+        ).hexdigest()[:8]
+        base = f"{mode_name}_{len(records)}_{width}x{height}_{backend}_{digest}"
+        return (os.path.join(self.graph_cache_dir, base + "_score.png"),
+                os.path.join(self.graph_cache_dir, base + "_accuracy.png"))
+    
+    def _load_cached_graphs(self, paths):
+        """从磁盘缓存读取图表"""
+        if not all(os.path.exists(path) for path in paths):
+            return None
+        try:
+            return tuple(pygame.image.load(path) for path in paths)
+        except (pygame.error, OSError):
+            return None
+    
+    def _save_cached_graphs(self, paths, graphs):
+        """将图表写入磁盘缓存"""
+        try:
+            os.makedirs(self.graph_cache_dir, exist_ok=True)
+            for path, graph in zip(paths, graphs):
+                pygame.image.save(graph, path)
+        except (pygame.error, OSError):
+            pass
+    
+    def create_history_graph(self, mode_name, width=400, height=200, backend=None, window=None):
+        """获取历史记录图表，优先使用缓存
+        backend: "pygame" 或 "matplotlib"，默认使用 self.graph_backend
+        window: 只画时间范围 (start, end) 内的记录，用于放大某一段历史，
+                点数同样按图表宽度重新下采样
+        """
+        backend = backend or self.graph_backend
+        if backend not in GRAPH_BACKENDS:
+            raise ValueError(f"未知的图表后端: {backend}")
         
-        # 将图表转换为pygame surface
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', transparent=True)
-        buf.seek(0)
-        plt.close()
+        count = self.count_records(mode_name)
+        if not count:
+            return None, None
+            
+        # 汇总之后记录数不变，但图表的数据变了
+        key = (mode_name, count, width, height, backend, window, self.rollups.version)
+        self.poll_graphs()
+        graphs = self.graph_cache.get(key)
+        if graphs is not None:
+            self.graph_cache.move_to_end(key)
+            return graphs
+        if self.renderer and self.renderer.is_pending(key):
+            return self._placeholder_graphs(width, height)
         
-        # 创建surface
-        score_graph = pygame.image.load(buf)
-        buf.close()
+        records = self.get_history_series(mode_name, *(window or ()))
+        if not records:
+            return None, None
+        paths = None
+        # 只有完整历史的matplotlib图表写入磁盘缓存；pygame绘制比读取PNG还快，不缓存
+        if self.graph_cache_dir and not window and backend == "matplotlib":
+            paths = self._graph_cache_paths(mode_name, records, width, height, backend)
+            graphs = self._load_cached_graphs(paths)
         
-        # 创建准确率图表
-        plt.figure(figsize=(width/100, height/100), dpi=100)
-        plt.style.use('dark_background')
+        if graphs is None:
+            if backend == "matplotlib" and self.renderer:
+                # 交给子进程绘制，先返回占位图
+                scores, accuracies = self._graph_series(records, width)
+                self.renderer.submit(key, scores, accuracies, width, height)
+                self.pending_graph_paths[key] = paths
+                return self._placeholder_graphs(width, height)
+            graphs = self._render_history_graph(records, width, height, backend)
+            if paths:
+                self.worker.submit(partial(self._save_cached_graphs, paths, graphs))
         
-        # 提取数据
+        self._store_graphs(key, graphs)
+        return graphs
+    
+    def _store_graphs(self, key, graphs):
+        """放入内存缓存，超过容量时淘汰最久未使用的图表"""
+        self.graph_cache[key] = graphs
+        while len(self.graph_cache) > self.graph_cache_size:
+            self.graph_cache.popitem(last=False)
+    
+    def _placeholder_graphs(self, width, height):
+        if (width, height) not in self.placeholders:
+            self.placeholders[(width, height)] = (
+                draw_placeholder(width, height, "Score History"),
+                draw_placeholder(width, height, "Accuracy History"),
+            )
+        return self.placeholders[(width, height)]
+    
+    def graphs_pending(self):
+        """是否有图表正在子进程中绘制"""
+        return bool(self.renderer and self.renderer.pending)
+    
+    def poll_graphs(self):
+        """取回子进程中画好的图表，有新图表时返回True(需要重绘)"""
+        if not self.graphs_pending():
+            return False
+        finished = self.renderer.collect()
+        for key, graphs in finished:
+            self._store_graphs(key, graphs)
+            paths = self.pending_graph_paths.pop(key, None)
+            if paths and graphs[0]:
+                # PNG编码也不放在主线程
+                self.worker.submit(partial(self._save_cached_graphs, paths, graphs))
+        return bool(finished)
+    
+    def prerender_graphs(self, mode_names, width=400, height=200):
+        """在进程池中并行绘制多个模式的图表，只对异步绘制的matplotlib后端有效"""
+        if self.graph_backend != "matplotlib" or not self.renderer:
+            return
+        for mode_name in mode_names:
+            self.create_history_graph(mode_name, width, height)
+    
+    def _graph_series(self, records, width):
+        """图表要画的分数和准确率序列，各为 (横坐标, 值)
+        记录比图表的像素宽度多时下采样，保留高峰和低谷；原始记录不变
+        """
+        scores = [r["score"] for r in records]
         accuracies = [r["accuracy"] for r in records]
+        if len(records) <= width or not self.downsample:
+            x = list(range(len(records)))
+            return (x, scores), (x, accuracies)
+        # 只在需要时才导入numpy
+        from src.utils.downsample import downsample
+        return (downsample(scores, width, self.downsample),
+                downsample(accuracies, width, self.downsample))
+    
+    def _render_history_graph(self, records, width, height, backend):
+        """绘制历史记录图表"""
+        scores, accuracies = self._graph_series(records, width)
+        if backend == "matplotlib":
+            return self._render_matplotlib_graph(scores, accuracies, width, height)
         
-        # 绘制准确率曲线
-        plt.plot(accuracies, color='#ff9900', marker='o')
-        plt.title(f'Accuracy History')
-        plt.grid(True, alpha=0.3)
-        
-        # 将图表转换为pygame surface
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', transparent=True)
-        buf.seek(0)
-        plt.close()
-        
-        # 创建surface
-        accuracy_graph = pygame.image.load(buf)
-        buf.close()
-        
-        return score_graph, accuracy_graph 
\ No newline at end of file
+        score_graph = draw_line_chart(scores[1], width, height, (0, 255, 0), "Score History", x=scores[0])
+        accuracy_graph = draw_line_chart(accuracies[1], width, height, (255, 153, 0), "Accuracy History",
+                                         x=accuracies[0])
+        return score_graph, accuracy_graph
+    
+    def _render_matplotlib_graph(self, scores, accuracies, width, height):
+        """使用matplotlib绘制历史记录图表，直接把RGBA像素转换为Surface"""
+        # 只在需要时才导入matplotlib
+        from src.utils.graph_renderer import render_history_rgba, to_surfaces
+        return to_surfaces(render_history_rgba(scores, accuracies, width, height))
\ No newline at end of file
@@ -0,0 +1,152 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from src.utils.file_lock import FileLock
+
+def aggregate(records):
+    """把一组记录汇总为 count/min/max/mean/best_accuracy/mean_accuracy"""
+    scores = [r["score"] for r in records]
+    accuracies = [r["accuracy"] for r in records]
+    return {
+        "count": len(records),
+        "min": min(scores),
+        "max": max(scores),
+        "mean": sum(scores) / len(scores),
+        "best_accuracy": max(accuracies),
+        "mean_accuracy": sum(accuracies) / len(accuracies),
+    }
+
+def merge(a, b):
+    """合并两个汇总"""
+    count = a["count"] + b["count"]
+    return {
+        "count": count,
+        "min": min(a["min"], b["min"]),
+        "max": max(a["max"], b["max"]),
+        "mean": (a["mean"] * a["count"] + b["mean"] * b["count"]) / count,
+        "best_accuracy": max(a["best_accuracy"], b["best_accuracy"]),
+        "mean_accuracy": (a["mean_accuracy"] * a["count"] + b["mean_accuracy"] * b["count"]) / count,
+    }
+
+def week_key(day):
+    """日期 "YYYY-MM-DD" 所在周的周一"""
+    date = datetime.strptime(day, "%Y-%m-%d")
+    return (date - timedelta(days=date.weekday())).strftime("%Y-%m-%d")
+
+class ScoreRollups:
+    """过了保留期的历史记录按天、按周汇总后的数据，保存在 rollup_file 中
+    
+    raw_before 之前的原始记录都已经汇总，汇总后原始记录才会从存储中删除；
+    中途退出时残留的原始记录按 raw_before 过滤掉，不会重复统计。
+    每个模式: {"daily": {日期: 汇总}, "weekly": {周一日期: 汇总}}
+    后台任务和主线程会同时访问，所有读写都在锁内进行；多个游戏实例
+    汇总时持有 file_lock，并先重新读取文件。
+    """
+    def __init__(self, rollup_file="data/rollups.json"):
+        self.rollup_file = rollup_file
+        self.lock = threading.Lock()
+        self.file_lock = FileLock(rollup_file + ".lock")
+        self.raw_before = None
+        self.modes = {}
+        # 每个模式汇总的记录数，避免每次都遍历所有桶
+        self.totals = {}
+        # 每次汇总后加一，图表缓存以此判断是否过期
+        self.version = 0
+        self.load()
+    
+    def load(self):
+        raw_before = None
+        modes = {}
+        if os.path.exists(self.rollup_file):
+            try:
+                with open(self.rollup_file, "r") as f:
+                    data = json.load(f)
+                raw_before = data["raw_before"]
+                modes = data["modes"]
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Error loading rollups: {e}")
+        with self.lock:
+            if raw_before == self.raw_before and modes == self.modes:
+                return
+            self.raw_before = raw_before
+            self.modes = modes
+            self.totals = {mode: self._total(tiers) for mode, tiers in modes.items()}
+            self.version += 1
+    
+    @staticmethod
+    def _total(tiers):
+        return sum(a["count"] for tier in tiers.values() for a in tier.values())
+    
+    def save(self):
+        """原子地写入汇总文件：先写临时文件并fsync，再替换"""
+        with self.lock:
+            data = json.dumps({"raw_before": self.raw_before, "modes": self.modes})
+        temp_file = self.rollup_file + ".tmp"
+        with open(temp_file, "w") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_file, self.rollup_file)
+    
+    def get_modes(self):
+        return list(self.modes)
+    
+    def count(self, mode_name):
+        return self.totals.get(mode_name, 0)
+    
+    def roll_up(self, expired, raw_before, weekly_before):
+        """把原始记录汇总进按天的数据，再把 weekly_before 之前的天合并为按周的数据
+        expired: {模式: [raw_before 之前、还没有汇总过的记录]}
+        """
+        with self.lock:
+            for mode_name, records in expired.items():
+                daily = self.modes.setdefault(mode_name, {"daily": {}, "weekly": {}})["daily"]
+                by_day = {}
+                for record in records:
+                    by_day.setdefault(record["timestamp"][:10], []).append(record)
+                for day, day_records in by_day.items():
+                    summary = aggregate(day_records)
+                    daily[day] = merge(daily[day], summary) if day in daily else summary
+            
+            for tiers in self.modes.values():
+                daily, weekly = tiers["daily"], tiers["weekly"]
+                for day in [day for day in daily if day < weekly_before]:
+                    week = week_key(day)
+                    summary = daily.pop(day)
+                    weekly[week] = merge(weekly[week], summary) if week in weekly else summary
+            
+            self.raw_before = raw_before
+            self.totals = {mode: self._total(tiers) for mode, tiers in self.modes.items()}
+            self.version += 1
+    
+    def series(self, mode_name, start=None, end=None):
+        """[start, end] 范围内的汇总数据，转换为记录的格式并按时间排序:
+        score/accuracy 为平均值，另外带有 tier、count、min、max、best_accuracy
+        """
+        start = start[:10] if start else None
+        end = end[:10] if end else None
+        with self.lock:
+            tiers = self.modes.get(mode_name)
+            if not tiers:
+                return []
+            entries = [
+                (key, tier, summary)
+                for tier in ("weekly", "daily")
+                for key, summary in tiers[tier].items()
+                if (start is None or key >= start) and (end is None or key <= end)
+            ]
+        entries.sort(key=lambda entry: entry[0])
+        return [
+            {
+                "timestamp": f"{key} 00:00:00",
+                "score": summary["mean"],
+                "accuracy": summary["mean_accuracy"],
+                "tier": tier,
+                "count": summary["count"],
+                "min": summary["min"],
+                "max": summary["max"],
+                "best_accuracy": summary["best_accuracy"],
+            }
+            for key, tier, summary in entries
+        ]
@@ -0,0 +1,255 @@
+import heapq
+import json
+import math
+import os
+
+class QuantileSketch:
+    """对数分桶的流式分位数估计(DDSketch)
+    
+    值 x 落在第 ceil(log_gamma(x)) 个桶里，估计值的相对误差不超过
+    relative_accuracy。桶的数量只与分数范围有关，与记录数无关。
+    """
+    def __init__(self, relative_accuracy=0.01, max_buckets=2048):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.max_buckets = max_buckets
+        self.buckets = {}
+        # 0分和负分单独计数
+        self.zero_count = 0
+        self.count = 0
+    
+    def _key(self, value):
+        return math.ceil(math.log(value) / self.log_gamma)
+    
+    def _value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+    
+    def add(self, value, count=1):
+        self.count += count
+        if value <= 0:
+            self.zero_count += count
+            return
+        key = self._key(value)
+        self.buckets[key] = self.buckets.get(key, 0) + count
+        if len(self.buckets) > self.max_buckets:
+            # 桶太多时合并最小的两个，只影响最低的分位数
+            low, second = sorted(self.buckets)[:2]
+            self.buckets[second] += self.buckets.pop(low)
+    
+    def quantile(self, q):
+        """第 q (0~1) 分位数的估计值"""
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zero_count
+        if rank < seen:
+            return 0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if rank < seen:
+                return self._value(key)
+        return self._value(max(self.buckets))
+    
+    def rank(self, value, exclude=0):
+        """严格低于 value 的记录占其他记录的比例 (0~1)，没有其他记录时为None
+        exclude: 不参与比较的记录数，例如 value 自己已经在统计中时为1；
+        与 value 落在同一个桶中的记录视为相同，不算作低于
+        """
+        others = self.count - exclude
+        if others <= 0:
+            return None
+        if value <= 0:
+            return 0.0
+        limit = self._key(value)
+        below = self.zero_count + sum(n for key, n in self.buckets.items() if key < limit)
+        return below / others
+    
+    def to_dict(self):
+        return {
+            "relative_accuracy": self.relative_accuracy,
+            "zero_count": self.zero_count,
+            "count": self.count,
+            "buckets": {str(key): n for key, n in self.buckets.items()},
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["relative_accuracy"])
+        sketch.zero_count = data["zero_count"]
+        sketch.count = data["count"]
+        sketch.buckets = {int(key): n for key, n in data["buckets"].items()}
+        return sketch
+
+class ModeStats:
+    """一个模式的增量统计，每条新记录 O(1) 更新
+    
+    count/mean/m2: Welford 算法的计数、均值和方差累积量
+    ewma:          指数加权移动平均，反映最近的水平
+    top:           前 top_k 个最高分的小顶堆 [分数, 时间]
+    sketch:        分数的分位数估计，用于计算最近一局的排名
+    """
+    def __init__(self, top_k=10, ewma_alpha=0.2):
+        self.top_k = top_k
+        self.ewma_alpha = ewma_alpha
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.ewma = None
+        self.top = []
+        self.last = None
+        self.sketch = QuantileSketch()
+    
+    def add(self, record):
+        score = record["score"]
+        self.count += 1
+        delta = score - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (score - self.mean)
+        
+        if self.ewma is None:
+            self.ewma = float(score)
+        else:
+            self.ewma += self.ewma_alpha * (score - self.ewma)
+        
+        entry = [score, record["timestamp"]]
+        if len(self.top) < self.top_k:
+            heapq.heappush(self.top, entry)
+        elif entry > self.top[0]:
+            heapq.heapreplace(self.top, entry)
+        
+        self.sketch.add(score)
+        self.last = score
+    
+    def add_aggregate(self, entry):
+        """加入按天/按周汇总的一组记录(ScoreRollups.series 的一项)
+        只知道组内的记录数、平均分和最高分，组内方差按0计算，分位数按平均分计算
+        """
+        n = entry["count"]
+        mean = entry["score"]
+        total = self.count + n
+        delta = mean - self.mean
+        self.mean += delta * n / total
+        self.m2 += delta * delta * self.count * n / total
+        self.count = total
+        
+        if self.ewma is None:
+            self.ewma = float(mean)
+        else:
+            self.ewma += self.ewma_alpha * (mean - self.ewma)
+        
+        top = [entry["max"], entry["timestamp"]]
+        if len(self.top) < self.top_k:
+            heapq.heappush(self.top, top)
+        elif top > self.top[0]:
+            heapq.heapreplace(self.top, top)
+        
+        self.sketch.add(mean, n)
+        self.last = mean
+    
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+    
+    def summary(self):
+        """菜单上显示的汇总数据"""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "stddev": math.sqrt(self.variance),
+            "ewma": self.ewma,
+            "best": max(self.top)[0],
+            "top": sorted(self.top, reverse=True),
+            "median": self.sketch.quantile(0.5),
+            "p90": self.sketch.quantile(0.9),
+            "last": self.last,
+            # 最近一局超过了多少比例的其他记录(不包括它自己)，只有一局时为None
+            "last_rank": self.sketch.rank(self.last, exclude=1),
+        }
+    
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "m2": self.m2,
+            "ewma": self.ewma,
+            "top": self.top,
+            "last": self.last,
+            "sketch": self.sketch.to_dict(),
+        }
+    
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        stats.count = data["count"]
+        stats.mean = data["mean"]
+        stats.m2 = data["m2"]
+        stats.ewma = data["ewma"]
+        stats.top = [list(entry) for entry in data["top"]]
+        heapq.heapify(stats.top)
+        stats.last = data["last"]
+        stats.sketch = QuantileSketch.from_dict(data["sketch"])
+        return stats
+
+class ScoreStats:
+    """所有模式的增量统计，保存在 stats_file 中"""
+    def __init__(self, stats_file="data/stats.json"):
+        self.stats_file = stats_file
+        self.modes = {}
+        self.load()
+    
+    def load(self):
+        self.modes = {}
+        if not os.path.exists(self.stats_file):
+            return
+        try:
+            with open(self.stats_file, "r") as f:
+                data = json.load(f)
+            self.modes = {mode: ModeStats.from_dict(d) for mode, d in data.items()}
+        except (OSError, ValueError, KeyError) as e:
+            # 统计数据可以从历史记录重建，读取失败时丢弃
+            print(f"Error loading stats: {e}")
+            self.modes = {}
+    
+    def snapshot(self):
+        """当前统计数据的副本，可以交给后台线程写入"""
+        return {mode: stats.to_dict() for mode, stats in self.modes.items()}
+    
+    def save(self, data=None):
+        """原子地写入统计文件：先写临时文件并fsync，再替换
+        多个实例各自写入完整的统计，记录数与历史不一致时会在加载时重建
+        """
+        if data is None:
+            data = self.snapshot()
+        # 临时文件名带进程号，多个实例同时保存时不会互相覆盖
+        temp_file = f"{self.stats_file}.{os.getpid()}.tmp"
+        try:
+            with open(temp_file, "w") as f:
+                json.dump(data, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_file, self.stats_file)
+        except OSError as e:
+            print(f"Error saving stats: {e}")
+    
+    def get(self, mode_name):
+        return self.modes.get(mode_name) or ModeStats()
+    
+    def count(self, mode_name):
+        stats = self.modes.get(mode_name)
+        return stats.count if stats else 0
+    
+    def add(self, mode_name, record):
+        self.modes.setdefault(mode_name, ModeStats()).add(record)
+    
+    def rebuild(self, mode_name, records):
+        """从完整的历史记录重新计算一个模式的统计，records 中可以有汇总数据(带 tier)"""
+        stats = ModeStats()
+        for record in records:
+            if "tier" in record:
+                stats.add_aggregate(record)
+            else:
+                stats.add(record)
+        self.modes[mode_name] = stats
@@ -1,75 +1,70 @@
 import pygame
-import ctypes
-import win32api
-import win32con
+from src.utils.input_backend import create_backend
 
-class MouseControls:
-    """鼠标控制类"""
-    MOUSEEVENTF_MOVE = 0x0001
-    MOUSEEVENTF_ABSOLUTE = 0x8000
-    SM_CXSCREEN = 0
-    SM_CYSCREEN = 1
-
-    def move_relative(self, x, y):
-        """相对移动鼠标"""
-        win32api.mouse_event(win32con.MOUSEEVENTF_MOVE, int(x), int(y), 0, 0)
-
-    def get_position(self):
-        """获取鼠标位置"""
-        return win32api.GetCursorPos()
+# 灵敏度范围，与设置界面的滑动条一致
+MIN_SENSITIVITY = 0.1
+MAX_SENSITIVITY = 2.0
 
 class SensitivityManager:
-    def __init__(self):
-        self.sensitivity = 1.0
-        pygame.event.set_grab(True)
-        pygame.mouse.set_visible(False)
-        
-        # 获取窗口和屏幕信息
-        self.window = pygame.display.get_surface()
-        self.window_pos = self.window.get_abs_offset()
-        self.center_x = self.window.get_width() // 2
-        self.center_y = self.window.get_height() // 2
-        
-        # 设置初始鼠标位置和准心位置
-        self.global_center = (self.window_pos[0] + self.center_x, 
-                            self.window_pos[1] + self.center_y)
-        win32api.SetCursorPos(self.global_center)
+    def __init__(self, backend="relative", bounds=None, sensitivity=None):
+        """
+        backend: 输入后端 "relative"(SDL相对鼠标模式)、"win32" 或 None(不读取设备)
+        bounds: 准心的活动范围 (宽, 高)，默认使用当前窗口大小
+        """
+        if bounds is None:
+            window = pygame.display.get_surface()
+            bounds = (window.get_width(), window.get_height())
+        self.width, self.height = bounds
+        self.center_x = self.width // 2
+        self.center_y = self.height // 2
         
-        # 用于跟踪准心位置
+        # 用于跟踪准心位置，使用浮点数累积亚像素的移动
         self.crosshair_x = float(self.center_x)
         self.crosshair_y = float(self.center_y)
         
-        # 存储上一次的鼠标位置
-        self.last_mouse_pos = pygame.mouse.get_pos()
-        
         # 获取设置
-        from src.settings import Settings
-        self.settings = Settings()
-        self.sensitivity = self.settings.sensitivity
+        if sensitivity is None:
+            from src.settings import Settings
+            sensitivity = Settings().sensitivity
+        self.sensitivity = sensitivity
+        
+        self.backend = create_backend(backend)
+        self.start()
+    
+    def start(self):
+        """开始读取鼠标: 隐藏光标并锁定输入，丢弃之前累计的移动
+        结束界面会重新显示光标，重新开始一局时需要再次调用
+        """
+        self.backend.start((self.center_x, self.center_y))
+        self.backend.poll()
     
     def set_sensitivity(self, value):
         """设置灵敏度"""
         self.sensitivity = value
     
+    def adjust_sensitivity(self, steps):
+        """用鼠标滚轮调整灵敏度，每格0.1"""
+        value = round(self.sensitivity + steps * 0.1, 2)
+        self.sensitivity = max(MIN_SENSITIVITY, min(MAX_SENSITIVITY, value))
+        return self.sensitivity
+    
+    def handle_event(self, event):
+        """把输入事件交给后端，相对模式下会累加每个 MOUSEMOTION 的移动量"""
+        self.backend.handle_event(event)
+    
+    def apply_motion(self, dx, dy):
+        """按灵敏度移动准心，返回新的位置(浮点数)"""
+        self.crosshair_x = max(0.0, min(self.width, self.crosshair_x + dx * self.sensitivity))
+        self.crosshair_y = max(0.0, min(self.height, self.crosshair_y + dy * self.sensitivity))
+        return self.crosshair_x, self.crosshair_y
+    
     def update(self):
         """获取鼠标移动并返回调整后的位置"""
-        current_mouse_pos = pygame.mouse.get_pos()
-        
-        # 使用当前灵敏度设置
-        dx = (current_mouse_pos[0] - self.last_mouse_pos[0]) * self.sensitivity
-        dy = (current_mouse_pos[1] - self.last_mouse_pos[1]) * self.sensitivity
-        
-        # 更新准心位置
-        self.crosshair_x = max(0, min(self.window.get_width(), self.crosshair_x + dx))
-        self.crosshair_y = max(0, min(self.window.get_height(), self.crosshair_y + dy))
-        
-        # 将鼠标重置到窗口中心
-        pygame.mouse.set_pos((self.center_x, self.center_y))
-        self.last_mouse_pos = (self.center_x, self.center_y)
-        
+        dx, dy = self.backend.poll()
+        if dx or dy:
+            self.apply_motion(dx, dy)
         return int(self.crosshair_x), int(self.crosshair_y)
     
     def cleanup(self):
         """清理函数"""
-        pygame.event.set_grab(False)
-        pygame.mouse.set_visible(True) 
\ No newline at end of file
+        self.backend.stop()
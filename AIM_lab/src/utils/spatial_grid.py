@@ -0,0 +1,96 @@
+import random
+
+class TargetGrid:
+    """存活目标的均匀网格索引
+    
+    格子边长等于目标之间的最小间距，任意一点附近需要检查的目标
+    都在周围3x3个格子里。命中检测和重叠检查平均为 O(1)，
+    与目标数量无关，适合几百个目标的密集模式。
+    """
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        # (格子x, 格子y) -> [目标编号]
+        self.cells = {}
+        # 目标编号 -> (x, y)
+        self.positions = {}
+    
+    def _cell(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+    
+    def clear(self):
+        self.cells.clear()
+        self.positions.clear()
+    
+    def insert(self, index, x, y):
+        self.positions[index] = (x, y)
+        self.cells.setdefault(self._cell(x, y), []).append(index)
+    
+    def remove(self, index):
+        position = self.positions.pop(index, None)
+        if position is None:
+            return
+        cell = self._cell(*position)
+        members = self.cells[cell]
+        members.remove(index)
+        if not members:
+            del self.cells[cell]
+    
+    def move(self, index, x, y):
+        self.remove(index)
+        self.insert(index, x, y)
+    
+    def nearby(self, x, y, radius):
+        """返回距离 (x, y) 不超过 radius 的目标编号，radius 不能大于格子边长"""
+        cx, cy = self._cell(x, y)
+        limit = radius * radius
+        found = []
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for index in self.cells.get((gx, gy), ()):
+                    tx, ty = self.positions[index]
+                    if (x - tx) ** 2 + (y - ty) ** 2 <= limit:
+                        found.append(index)
+        return found
+    
+    def hit_test(self, x, y, radius):
+        """返回被击中的目标编号，多个时取编号最小的，没有击中返回None"""
+        found = self.nearby(x, y, radius)
+        return min(found) if found else None
+    
+    def is_free(self, x, y):
+        """(x, y) 与所有目标的距离是否都不小于最小间距"""
+        cx, cy = self._cell(x, y)
+        limit = self.cell_size * self.cell_size
+        for gx in (cx - 1, cx, cx + 1):
+            for gy in (cy - 1, cy, cy + 1):
+                for index in self.cells.get((gx, gy), ()):
+                    tx, ty = self.positions[index]
+                    if (x - tx) ** 2 + (y - ty) ** 2 < limit:
+                        return False
+        return True
+    
+    def find_position(self, bounds, rng=random, attempts=30):
+        """在 bounds (左, 上, 右, 下) 内找一个不与其他目标重叠的位置
+        
+        先随机尝试 attempts 次；都失败时按固定步长扫描整个区域(从随机位置开始)，
+        取第一个空位。区域内确实没有空位时返回None，不会无限循环。
+        """
+        left, top, right, bottom = bounds
+        for _ in range(attempts):
+            x = rng.randint(left, right)
+            y = rng.randint(top, bottom)
+            if self.is_free(x, y):
+                return x, y
+        
+        step = max(1, int(self.cell_size // 2))
+        candidates = [
+            (x, y)
+            for y in range(top, bottom + 1, step)
+            for x in range(left, right + 1, step)
+        ]
+        start = rng.randrange(len(candidates))
+        for i in range(len(candidates)):
+            x, y = candidates[(start + i) % len(candidates)]
+            if self.is_free(x, y):
+                return x, y
+        return None
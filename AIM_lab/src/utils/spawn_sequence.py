@@ -0,0 +1,136 @@
+import hashlib
+import json
+import math
+import os
+import random
+from src.utils.spatial_grid import TargetGrid
+
+# 修改生成算法时增加版本号，使旧的缓存失效
+SEQUENCE_VERSION = 1
+
+def poisson_disk(bounds, radius, rng, attempts=30):
+    """Bridson 算法生成泊松圆盘采样(蓝噪声)点集
+    
+    bounds: (左, 上, 右, 下)，上下相等时只在一条水平线上采样
+    返回的点两两之间距离不小于 radius，坐标为整数
+    """
+    left, top, right, bottom = bounds
+    flat = top == bottom
+    grid = TargetGrid(radius)
+    first = (rng.randint(left, right), rng.randint(top, bottom))
+    points = [first]
+    active = [0]
+    grid.insert(0, *first)
+    
+    while active:
+        i = rng.randrange(len(active))
+        px, py = points[active[i]]
+        for _ in range(attempts):
+            # 在 [radius, 2*radius] 的圆环内取候选点
+            distance = rng.uniform(radius, 2 * radius)
+            if flat:
+                x, y = round(px + rng.choice((-1, 1)) * distance), py
+            else:
+                angle = rng.uniform(0, 2 * math.pi)
+                x = round(px + math.cos(angle) * distance)
+                y = round(py + math.sin(angle) * distance)
+            if left <= x <= right and top <= y <= bottom and grid.is_free(x, y):
+                grid.insert(len(points), x, y)
+                active.append(len(points))
+                points.append((x, y))
+                break
+        else:
+            # 周围已经放满，不再从这个点扩展
+            active[i] = active[-1]
+            active.pop()
+    return points
+
+class SpawnSequence:
+    """一局游戏的目标生成序列
+    
+    开局前由种子一次性生成：多层泊松圆盘点集，每层打乱顺序后首尾相接。
+    同一层内的点互不重叠，连续出现的目标分布均匀；计时开始后每次生成
+    目标只是从队列里取下一个位置。相同的种子和区域总是得到相同的序列，
+    可以缓存在磁盘上，用于基准测试和排行榜的公平比较。
+    seed 为None时每局随机选一个种子，不写入缓存。
+    """
+    def __init__(self, bounds, min_distance, seed=None, length=1000,
+                 cache_dir="data/spawn_cache"):
+        self.bounds = bounds
+        self.min_distance = min_distance
+        self.length = length
+        self.cache_dir = cache_dir
+        self.fixed_seed = seed is not None
+        self._prepare(seed)
+    
+    def _prepare(self, seed):
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        # 队列里的位置都被占用时使用，保证回退结果也可以复现
+        self.random = random.Random(seed)
+        self.next_index = 0
+        self.positions = self._load_cached()
+        if self.positions is None:
+            self.positions = self._generate()
+            self._save_cached()
+    
+    def restart(self):
+        """重新开始一局：固定种子时从头播放同一序列，否则换一个新种子"""
+        if self.fixed_seed:
+            self.random = random.Random(self.seed)
+            self.next_index = 0
+        else:
+            self._prepare(None)
+    
+    def _generate(self):
+        rng = random.Random(self.seed)
+        positions = []
+        while len(positions) < self.length:
+            layer = poisson_disk(self.bounds, self.min_distance, rng)
+            rng.shuffle(layer)
+            positions.extend(layer)
+        return positions[:self.length]
+    
+    def next(self, grid=None, attempts=8):
+        """取下一个生成位置
+        
+        grid: 存活目标的索引，跳过与存活目标重叠的位置(只可能发生在两层交界处
+        或序列循环之后)。连续 attempts 个位置都被占用时返回None。
+        """
+        for _ in range(attempts):
+            x, y = self.positions[self.next_index % len(self.positions)]
+            self.next_index += 1
+            if grid is None or grid.is_free(x, y):
+                return x, y
+        return None
+    
+    def _cache_path(self):
+        if not self.fixed_seed or not self.cache_dir:
+            return None
+        key = json.dumps([SEQUENCE_VERSION, self.bounds, self.min_distance, self.seed, self.length])
+        digest = hashlib.md5(key.encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.json")
+    
+    def _load_cached(self):
+        path = self._cache_path()
+        if not path or not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r") as f:
+                return [tuple(p) for p in json.load(f)["positions"]]
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    def _save_cached(self):
+        path = self._cache_path()
+        if not path:
+            return
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_file = path + ".tmp"
+            with open(temp_file, "w") as f:
+                json.dump({"seed": self.seed, "positions": self.positions}, f)
+            os.replace(temp_file, path)
+        except OSError as e:
+            print(f"Error caching spawn sequence: {e}")
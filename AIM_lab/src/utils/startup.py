@@ -0,0 +1,74 @@
+"""启动性能: 首帧时间和模块导入耗时
+
+main.py 最先导入这个模块，START 近似为程序开始执行的时间(不含解释器自身的启动)。
+python main.py --startup-profile 在子进程中用 -X importtime 启动一次游戏，
+显示第一帧后退出，打印导入最慢的模块和首帧时间。
+"""
+import os
+import sys
+import time
+
+START = time.perf_counter()
+
+# 设置为1时显示第一帧就打印首帧时间并退出
+FIRST_FRAME_ENV = "AIM_EXIT_AFTER_FIRST_FRAME"
+FIRST_FRAME_PREFIX = "first frame:"
+
+_first_frame_ms = None
+
+def first_frame_shown():
+    """主菜单每次绘制后调用，只记录第一次"""
+    global _first_frame_ms
+    if _first_frame_ms is not None:
+        return
+    _first_frame_ms = (time.perf_counter() - START) * 1000
+    if os.environ.get(FIRST_FRAME_ENV) == "1":
+        print(f"{FIRST_FRAME_PREFIX} {_first_frame_ms:.1f} ms", flush=True)
+        sys.exit(0)
+
+def time_to_first_frame():
+    """首帧时间(毫秒)，还没有显示时为None"""
+    return _first_frame_ms
+
+def run_first_frame(script, importtime=False, env=None):
+    """在子进程中启动游戏直到第一帧，返回 (首帧毫秒, 子进程的stderr)"""
+    # 只在分析启动时间时才需要，不拖慢正常启动
+    import subprocess
+    
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command.append(os.path.abspath(script))
+    child_env = dict(os.environ, **(env or {}))
+    child_env[FIRST_FRAME_ENV] = "1"
+    result = subprocess.run(command, cwd=os.path.dirname(os.path.abspath(script)),
+                            env=child_env, capture_output=True, text=True)
+    for line in result.stdout.splitlines():
+        if line.startswith(FIRST_FRAME_PREFIX):
+            return float(line[len(FIRST_FRAME_PREFIX):].split()[0]), result.stderr
+    raise RuntimeError(f"游戏没有显示第一帧:\n{result.stderr[-2000:]}")
+
+def parse_importtime(stderr):
+    """解析 -X importtime 的输出，返回 [(累计微秒, 自身微秒, 模块名)]，按累计耗时降序"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        imports.append((int(fields[1]), int(fields[0]), fields[2].strip()))
+    imports.sort(reverse=True)
+    return imports
+
+def profile_startup(script, top=25):
+    """打印启动时导入最慢的模块和首帧时间"""
+    first_frame, stderr = run_first_frame(script, importtime=True)
+    imports = parse_importtime(stderr)
+    print(f"{'累计(ms)':>10} {'自身(ms)':>10}  模块")
+    for cumulative, self_time, name in imports[:top]:
+        print(f"{cumulative / 1000:10.1f} {self_time / 1000:10.1f}  {name}")
+    total = sum(self_time for _, self_time, _ in imports) / 1000
+    print(f"共导入 {len(imports)} 个模块，耗时 {total:.1f} ms")
+    print(f"首帧时间: {first_frame:.1f} ms (包含 -X importtime 本身的开销)")
+    return 0